@@ -17,16 +17,28 @@ from .src.factuality import Factuality
 from .src.toxicity import Toxicity
 from .src.pii import Pii
 from .src.injection import Injection
+from .src.guard import Guard
 from .src.mcp_servers import MCPServers
 from .src.mcp_tools import MCPTools
 from .src.models import Models
+from .src.cache import EmbeddingsCache, LRUCache, SQLiteCache, TieredCache
+from .src.shared import SharedEmbeddings
+from .src.vector_index import VectorIndex
+from .src.bm25 import BM25Index
+from .src.retrieval import RetrievalPipeline
+from .src.near_duplicates import NearDuplicateDetector
+from .src.semantic_cache import SemanticCache
+from .src.single_flight import SingleFlight
 from .version import __version__
 
 __all__ = [
     "PredictionGuard", "Responses", "Chat", "Completions", "Embeddings",
     "Audio", "Documents", "Rerank", "Tokenize", "Translate", "Detokenize",
-    "Factuality", "Toxicity", "Pii", "Injection", "MCPServers", "MCPTools",
-    "Models"
+    "Factuality", "Toxicity", "Pii", "Injection", "Guard", "MCPServers", "MCPTools",
+    "Models", "EmbeddingsCache", "LRUCache", "SQLiteCache", "TieredCache",
+    "SharedEmbeddings",
+    "VectorIndex", "BM25Index", "RetrievalPipeline", "NearDuplicateDetector",
+    "SemanticCache", "SingleFlight"
 ]
 
 class PredictionGuard:
@@ -120,6 +132,9 @@ class PredictionGuard:
         self.injection: Injection = Injection(self.api_key, self.url, self.timeout)
         """Injection detects potential prompt injection attacks in a given prompt."""
 
+        self.guard: Guard = Guard(self.injection, self.pii, self.toxicity, self.chat.completions)
+        """Guard runs the injection, PII and toxicity checks concurrently and aggregates a verdict."""
+
         self.tokenize: Tokenize = Tokenize(self.api_key, self.url, self.timeout)
         """Tokenize generates tokens for input text."""
 
@@ -0,0 +1,134 @@
+import threading
+
+from typing import Any, Callable, Dict, Hashable, List
+
+
+class _Batch:
+    def __init__(self):
+        self.items = []
+        self.full = threading.Event()
+        self.done = threading.Event()
+        self.results = None
+        self.error = None
+
+
+class MicroBatcher:
+    """
+    MicroBatcher collects items submitted concurrently from many threads
+    and hands them to function as one list. The first caller of a batch
+    waits up to max_wait seconds, or until max_batch_size items have
+    arrived, then calls function for the whole batch while the other callers
+    wait; every caller receives the result at its own position. Items are
+    only batched with items submitted under the same key, such as the same
+    request options.
+
+    Usage::
+
+        from predictionguard.src.batching import MicroBatcher
+
+        def check(options, prompts):
+            return [len(prompt) for prompt in prompts]
+
+        batcher = MicroBatcher(check, max_wait=0.005, max_batch_size=64)
+        print(batcher.submit(("detect",), "Hello"))
+    """
+
+    def __init__(
+        self,
+        function: Callable[[Hashable, List[Any]], List[Any]],
+        max_wait: float = 0.005,
+        max_batch_size: int = 64
+    ):
+        """
+        :param function: Callable mapping a key and a list of items to a list of results in the same order.
+        :param max_wait: Seconds the first item of a batch waits for more items.
+        :param max_batch_size: Number of items at which a batch is sent without waiting further.
+        """
+
+        if max_wait < 0:
+            raise ValueError("Please enter a max_wait value of at least 0.")
+        if max_batch_size < 1:
+            raise ValueError("Please enter a max_batch_size of at least 1.")
+
+        self.function = function
+        self.max_wait = max_wait
+        self.max_batch_size = max_batch_size
+
+        self._pending = {}
+        self._lock = threading.Lock()
+
+    def submit(self, key: Hashable, item: Any) -> Any:
+        """
+        Adds item to the open batch for key and returns its result once the
+        batch has been processed.
+
+        :param key: Items are only batched together under the same key.
+        :param item: The item to process.
+        :return: The result of function for item.
+        """
+
+        with self._lock:
+            batch = self._pending.get(key)
+            leader = batch is None
+            if leader:
+                batch = self._pending[key] = _Batch()
+
+            position = len(batch.items)
+            batch.items.append(item)
+            if len(batch.items) >= self.max_batch_size:
+                # Later callers start a new batch while this one is sent.
+                del self._pending[key]
+                batch.full.set()
+
+        if leader:
+            batch.full.wait(self.max_wait)
+            with self._lock:
+                if self._pending.get(key) is batch:
+                    del self._pending[key]
+
+            try:
+                batch.results = self.function(key, batch.items)
+            except BaseException as error:
+                batch.error = error
+            finally:
+                batch.done.set()
+        else:
+            batch.done.wait()
+
+        if batch.error is not None:
+            raise batch.error
+        return batch.results[position]
+
+
+def split_checks(response: Dict[str, Any], count: int) -> List[Dict[str, Any]]:
+    """
+    Splits a guardrail response for a list of prompts into one response per
+    prompt, each shaped like the response for that prompt sent on its own.
+
+    :param response: The response for the list of prompts.
+    :param count: The number of prompts that were sent.
+    :return: A list of responses in prompt order.
+    """
+
+    checks = sorted(response["checks"], key=lambda check: check.get("index", 0))
+    if len(checks) != count:
+        raise ValueError("Could not split the batched checks.")
+
+    fields = {key: value for key, value in response.items() if key != "checks"}
+    return [dict(fields, checks=[dict(check, index=0)]) for check in checks]
+
+
+def merge_checks(responses: List[Dict[str, Any]]) -> Dict[str, Any]:
+    """
+    Merges single prompt guardrail responses into one response for the list
+    of prompts, the inverse of split_checks.
+
+    :param responses: The response of every prompt, in prompt order.
+    :return: A response with one check per prompt.
+    """
+
+    ret = {key: value for key, value in responses[0].items() if key != "checks"} if responses else {}
+    ret["checks"] = [
+        dict(response["checks"][0], index=index) for index, response in enumerate(responses)
+    ]
+    return ret
@@ -0,0 +1,283 @@
+import re
+import math
+
+from array import array
+from typing import Any, Callable, Dict, List, Mapping, Optional, Sequence, Tuple
+
+from .optional import try_numpy
+
+
+_TOKEN_PATTERN = re.compile(r"\w+")
+
+
+def _tokenize(text: str) -> List[str]:
+    return _TOKEN_PATTERN.findall(text.lower())
+
+
+class BM25Index:
+    """
+    BM25Index is an in-process inverted index that scores documents with
+    Okapi BM25. Postings are kept as compact unsigned integer arrays of
+    document numbers and term frequencies rather than per-document objects,
+    and documents can be added and deleted incrementally. It is meant as a
+    cheap first stage that narrows a large corpus down to a few candidates
+    before they are sent to /rerank.
+
+    Usage::
+
+        from predictionguard import PredictionGuard
+        from predictionguard.src.bm25 import BM25Index
+
+        client = PredictionGuard()
+
+        index = BM25Index()
+        index.add(
+            ["doc-1", "doc-2"],
+            ["Deep Learning is pizza.", "Deep Learning is not pizza."]
+        )
+
+        response = index.rerank(
+            client.rerank,
+            model="bge-reranker-v2-m3",
+            query="What is Deep Learning?",
+            n=100
+        )
+    """
+
+    def __init__(
+        self,
+        k1: float = 1.5,
+        b: float = 0.75,
+        tokenizer: Optional[Callable[[str], List[str]]] = None,
+        store_documents: bool = True
+    ):
+        """
+        :param k1: Term frequency saturation parameter.
+        :param b: Document length normalization parameter.
+        :param tokenizer: Callable splitting text into terms. Defaults to lowercased word characters.
+        :param store_documents: Whether to keep document texts so rerank can send them.
+        """
+
+        self.k1 = k1
+        self.b = b
+        self.tokenizer = tokenizer or _tokenize
+        self.store_documents = store_documents
+
+        self._docs = {}
+        self._tfs = {}
+        self._lengths = array("I")
+        self._ids = []
+        self._numbers = {}
+        self._documents = {}
+        self._total_length = 0
+        self._deleted = 0
+
+    def __len__(self) -> int:
+        return len(self._numbers)
+
+    def __contains__(self, id: Any) -> bool:
+        return id in self._numbers
+
+    def add(self, ids: Sequence[Any], texts: Sequence[str]) -> None:
+        """
+        Adds documents, replacing any document already stored under an id.
+
+        :param ids: Ids of the documents, in the same order as texts.
+        :param texts: Texts of the documents.
+        """
+
+        if len(ids) != len(texts):
+            raise ValueError("Please enter the same number of ids and texts.")
+
+        self.delete([id for id in ids if id in self._numbers])
+
+        for id, text in zip(ids, texts):
+            number = len(self._ids)
+            terms = self.tokenizer(text)
+
+            counts = {}
+            for term in terms:
+                counts[term] = counts.get(term, 0) + 1
+
+            for term, count in counts.items():
+                docs = self._docs.get(term)
+                if docs is None:
+                    docs = self._docs[term] = array("I")
+                    self._tfs[term] = array("I")
+                docs.append(number)
+                self._tfs[term].append(count)
+
+            self._ids.append(id)
+            self._numbers[id] = number
+            self._lengths.append(len(terms))
+            self._total_length += len(terms)
+            if self.store_documents:
+                self._documents[id] = text
+
+    def delete(self, ids: Sequence[Any]) -> None:
+        """
+        Removes documents. Unknown ids are ignored. Postings of deleted
+        documents are skipped at query time and dropped by compact.
+        """
+
+        for id in ids:
+            number = self._numbers.pop(id, None)
+            if number is None:
+                continue
+            self._total_length -= self._lengths[number]
+            self._ids[number] = None
+            self._documents.pop(id, None)
+            self._deleted += 1
+
+        if self._deleted > 1024 and self._deleted * 2 > len(self._ids):
+            self.compact()
+
+    def compact(self) -> None:
+        """
+        Rebuilds the postings without deleted documents.
+        """
+
+        remap = array("I")
+        live = 0
+        for id in self._ids:
+            remap.append(live)
+            if id is not None:
+                live += 1
+
+        for term in list(self._docs):
+            docs = array("I")
+            tfs = array("I")
+            for number, tf in zip(self._docs[term], self._tfs[term]):
+                if self._ids[number] is not None:
+                    docs.append(remap[number])
+                    tfs.append(tf)
+            if docs:
+                self._docs[term] = docs
+                self._tfs[term] = tfs
+            else:
+                del self._docs[term]
+                del self._tfs[term]
+
+        self._lengths = array(
+            "I", (length for length, id in zip(self._lengths, self._ids) if id is not None)
+        )
+        self._ids = [id for id in self._ids if id is not None]
+        self._numbers = {id: number for number, id in enumerate(self._ids)}
+        self._deleted = 0
+
+    def search(self, query: str, n: int = 100) -> List[Tuple[Any, float]]:
+        """
+        Returns the n best matching documents for a query.
+
+        :param query: The query text.
+        :param n: Maximum number of results.
+        :return: A list of (id, score) tuples, best first.
+        """
+
+        if len(self) == 0 or n <= 0:
+            return []
+
+        average_length = self._total_length / len(self)
+        terms = set(self.tokenizer(query))
+
+        np = try_numpy()
+        if np is not None:
+            scores = self._score_numpy(np, terms, average_length)
+            if self._deleted:
+                deleted = np.fromiter((id is None for id in self._ids), dtype=bool)
+                scores[deleted] = 0.0
+            matched = np.flatnonzero(scores > 0)
+            if len(matched) > n:
+                matched = matched[np.argpartition(-scores[matched], n - 1)[:n]]
+            ranked = sorted(
+                ((self._ids[number], float(scores[number])) for number in matched),
+                key=lambda result: -result[1]
+            )
+            return ranked
+
+        scores = self._score_python(terms, average_length)
+        ranked = sorted(scores.items(), key=lambda item: -item[1])[:n]
+        return [(self._ids[number], score) for number, score in ranked]
+
+    def rerank(
+        self,
+        rerank: Any,
+        model: str,
+        query: str,
+        n: int = 100,
+        documents: Optional[Mapping[Any, str]] = None
+    ) -> Dict[str, Any]:
+        """
+        Sends only the n best BM25 candidates for a query to /rerank and maps
+        the results back to document ids.
+
+        :param rerank: The client Rerank object, e.g. client.rerank.
+        :param model: The model to use for reranking.
+        :param query: The query to rank against.
+        :param n: Number of BM25 candidates sent to /rerank.
+        :param documents: Mapping of id to text, required when documents are not stored.
+        :return: The rerank response, with an "id" and "bm25_score" added to each result.
+        """
+
+        if documents is None:
+            if not self.store_documents:
+                raise ValueError(
+                    "Please provide documents when the index does not store them."
+                )
+            documents = self._documents
+
+        candidates = self.search(query, n)
+        if not candidates:
+            return {"object": "list", "model": model, "results": []}
+
+        response = rerank.create(
+            model=model,
+            query=query,
+            documents=[documents[id] for id, _ in candidates],
+            return_documents=False
+        )
+
+        for result in response["results"]:
+            id, bm25_score = candidates[result["index"]]
+            result["id"] = id
+            result["bm25_score"] = bm25_score
+
+        return response
+
+    def _idf(self, document_frequency):
+        return math.log(1.0 + (len(self) - document_frequency + 0.5) / (document_frequency + 0.5))
+
+    def _score_numpy(self, np, terms, average_length):
+        """
+        Function to score every document at once over zero-copy views of the postings.
+        """
+
+        lengths = np.frombuffer(self._lengths, dtype=np.uint32).astype(np.float32)
+        norms = self.k1 * (1.0 - self.b + self.b * lengths / average_length)
+        scores = np.zeros(len(self._ids), dtype=np.float32)
+
+        for term in terms:
+            docs = self._docs.get(term)
+            if docs is None:
+                continue
+            docs = np.frombuffer(docs, dtype=np.uint32)
+            tfs = np.frombuffer(self._tfs[term], dtype=np.uint32).astype(np.float32)
+            idf = self._idf(len(docs))
+            # A document appears at most once per term, so += is safe here.
+            scores[docs] += idf * tfs * (self.k1 + 1.0) / (tfs + norms[docs])
+
+        return scores
+
+    def _score_python(self, terms, average_length):
+        scores = {}
+        for term in terms:
+            docs = self._docs.get(term)
+            if docs is None:
+                continue
+            idf = self._idf(len(docs))
+            for number, tf in zip(docs, self._tfs[term]):
+                if self._ids[number] is None:
+                    continue
+                norm = self.k1 * (1.0 - self.b + self.b * self._lengths[number] / average_length)
+                scores[number] = scores.get(number, 0.0) + idf * tf * (self.k1 + 1.0) / (tf + norm)
+        return scores
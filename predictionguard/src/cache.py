@@ -0,0 +1,586 @@
+import os
+import copy
+import json
+import hashlib
+import sqlite3
+import threading
+import time
+
+try:
+    import fcntl
+except ImportError:
+    fcntl = None
+
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Iterator, List, Optional, Sequence, Union
+
+from .batching import merge_checks, split_checks
+from .optional import import_numpy
+
+
+class LRUCache:
+    """
+    LRUCache is a thread safe in-memory cache with least recently used
+    eviction and an optional time to live for its entries.
+
+    Usage::
+
+        from predictionguard.src.cache import LRUCache
+
+        cache = LRUCache(max_items=1000, ttl=3600)
+
+        cache.set("key", {"value": 1})
+        print(cache.get("key"))
+    """
+
+    def __init__(self, max_items: int = 10000, ttl: Optional[float] = None):
+        """
+        :param max_items: Maximum number of entries kept before the least recently used is evicted.
+        :param ttl: Seconds an entry stays valid, or None to keep entries until evicted.
+        """
+
+        if max_items < 1:
+            raise ValueError("Please enter a max_items value of at least 1.")
+
+        self.max_items = max_items
+        self.ttl = ttl
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def get(self, key: str, default: Any = None) -> Any:
+        """
+        Returns the value stored for key, or default if it is missing or expired.
+        """
+
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return default
+
+            value, expires = entry
+            if expires is not None and expires <= time.monotonic():
+                del self._entries[key]
+                return default
+
+            self._entries.move_to_end(key)
+            return value
+
+    def set(self, key: str, value: Any) -> None:
+        """
+        Stores value for key, evicting the least recently used entry when full.
+        """
+
+        expires = time.monotonic() + self.ttl if self.ttl is not None else None
+
+        with self._lock:
+            self._entries[key] = (value, expires)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_items:
+                self._entries.popitem(last=False)
+
+    def get_many(self, keys: Sequence[str]) -> List[Any]:
+        """
+        Returns the values stored for keys, with None for every miss.
+        """
+
+        return [self.get(key) for key in keys]
+
+    def delete(self, key: str) -> None:
+        with self._lock:
+            self._entries.pop(key, None)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+
+class SQLiteCache:
+    """
+    SQLiteCache is a persistent cache of JSON serializable values stored in
+    a SQLite database in write-ahead logging mode, so any number of threads
+    and processes can read and write the same file concurrently. Entries
+    can be given a time to live. It has the same get and set interface as
+    LRUCache, so either can be passed where a cache is accepted.
+
+    Usage::
+
+        from predictionguard import PredictionGuard
+        from predictionguard.src.cache import SQLiteCache
+
+        client = PredictionGuard()
+        cache = SQLiteCache("responses.sqlite", ttl=86400)
+
+        result = client.chat.completions.create(
+            model="Hermes-3-Llama-3.1-8B",
+            messages="Tell me a joke.",
+            temperature=0.0,
+            cache=cache
+        )
+    """
+
+    def __init__(self, path: str, ttl: Optional[float] = None, timeout: float = 30.0):
+        """
+        :param path: Path of the SQLite database file.
+        :param ttl: Seconds an entry stays valid, or None to keep entries until deleted.
+        :param timeout: Seconds to wait for a lock held by another connection.
+        """
+
+        self.path = path
+        self.ttl = ttl
+        self.timeout = timeout
+        self._local = threading.local()
+
+        self._connection().execute(
+            "CREATE TABLE IF NOT EXISTS entries "
+            "(key TEXT PRIMARY KEY, value TEXT NOT NULL, expires REAL)"
+        )
+
+    def __len__(self) -> int:
+        return self._connection().execute("SELECT COUNT(*) FROM entries").fetchone()[0]
+
+    def get(self, key: str, default: Any = None) -> Any:
+        """
+        Returns the value stored for key, or default if it is missing or expired.
+        """
+
+        row = self._connection().execute(
+            "SELECT value, expires FROM entries WHERE key = ?", (key,)
+        ).fetchone()
+
+        if row is None or (row[1] is not None and row[1] <= time.time()):
+            return default
+        return json.loads(row[0])
+
+    def set(self, key: str, value: Any) -> None:
+        """
+        Stores value for key, replacing any previous entry.
+        """
+
+        expires = time.time() + self.ttl if self.ttl is not None else None
+
+        self._connection().execute(
+            "INSERT OR REPLACE INTO entries (key, value, expires) VALUES (?, ?, ?)",
+            (key, json.dumps(value), expires)
+        )
+
+    def get_many(self, keys: Sequence[str]) -> List[Any]:
+        """
+        Returns the values stored for keys, with None for every miss.
+        """
+
+        connection = self._connection()
+        now = time.time()
+
+        found = {}
+        # Stay below the default limit of 999 bound parameters per statement.
+        for start in range(0, len(keys), 900):
+            chunk = keys[start:start + 900]
+            rows = connection.execute(
+                "SELECT key, value FROM entries WHERE key IN (%s) "
+                "AND (expires IS NULL OR expires > ?)" % ",".join("?" * len(chunk)),
+                (*chunk, now)
+            )
+            for key, value in rows:
+                found[key] = json.loads(value)
+
+        return [found.get(key) for key in keys]
+
+    def delete(self, key: str) -> None:
+        self._connection().execute("DELETE FROM entries WHERE key = ?", (key,))
+
+    def clear(self) -> None:
+        self._connection().execute("DELETE FROM entries")
+
+    def purge(self) -> None:
+        """
+        Removes expired entries from the database.
+        """
+
+        self._connection().execute(
+            "DELETE FROM entries WHERE expires IS NOT NULL AND expires <= ?", (time.time(),)
+        )
+
+    def _connection(self):
+        """
+        Function to return the connection of the current thread, opening a
+        new one in threads and forked processes that have none yet.
+        """
+
+        connection = getattr(self._local, "connection", None)
+        if connection is None or self._local.pid != os.getpid():
+            connection = sqlite3.connect(self.path, timeout=self.timeout, isolation_level=None)
+            connection.execute("PRAGMA journal_mode=WAL")
+            connection.execute("PRAGMA synchronous=NORMAL")
+            self._local.connection = connection
+            self._local.pid = os.getpid()
+        return connection
+
+    def __getstate__(self):
+        state = self.__dict__.copy()
+        del state["_local"]
+        return state
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        self._local = threading.local()
+
+
+class TieredCache:
+    """
+    TieredCache keeps recent entries in an in-memory LRUCache in front of an
+    optional SQLiteCache that can be shared between processes. Misses in
+    memory are looked up in the shared tier and copied into memory. Each
+    tier applies the time to live on its own.
+
+    Usage::
+
+        from predictionguard.src.cache import TieredCache
+
+        cache = TieredCache(max_items=10000, ttl=3600, path="guardrails.sqlite")
+
+        cache.set("key", {"value": 1})
+        print(cache.get_many(["key", "other"]))
+    """
+
+    def __init__(self, max_items: int = 10000, ttl: Optional[float] = None, path: Optional[str] = None):
+        """
+        :param max_items: Maximum number of entries kept in memory.
+        :param ttl: Seconds an entry stays valid, or None to keep entries until evicted.
+        :param path: Path of the shared SQLite database, or None for a memory only cache.
+        """
+
+        self.memory = LRUCache(max_items=max_items, ttl=ttl)
+        self.shared = SQLiteCache(path, ttl=ttl) if path is not None else None
+
+    def get(self, key: str, default: Any = None) -> Any:
+        value = self.get_many([key])[0]
+        return default if value is None else value
+
+    def set(self, key: str, value: Any) -> None:
+        self.memory.set(key, value)
+        if self.shared is not None:
+            self.shared.set(key, value)
+
+    def get_many(self, keys: Sequence[str]) -> List[Any]:
+        """
+        Returns the values stored for keys, with None for every miss.
+        """
+
+        values = self.memory.get_many(keys)
+        if self.shared is None:
+            return values
+
+        missing = [index for index, value in enumerate(values) if value is None]
+        if missing:
+            shared = self.shared.get_many([keys[index] for index in missing])
+            for index, value in zip(missing, shared):
+                if value is not None:
+                    self.memory.set(keys[index], value)
+                    values[index] = value
+
+        return values
+
+    def delete(self, key: str) -> None:
+        self.memory.delete(key)
+        if self.shared is not None:
+            self.shared.delete(key)
+
+    def clear(self) -> None:
+        self.memory.clear()
+        if self.shared is not None:
+            self.shared.clear()
+
+
+def content_keys(scope: Any, texts: Sequence[str]) -> List[str]:
+    """
+    Returns a cache key for every text, combining a hash of the text with a
+    hash of the JSON serializable scope, such as the API path and parameters.
+    """
+
+    scope = hashlib.sha256(json.dumps(scope, sort_keys=True).encode("utf-8")).hexdigest()
+
+    return [
+        hashlib.sha256(
+            (scope + hashlib.sha256(text.encode("utf-8")).hexdigest()).encode("utf-8")
+        ).hexdigest()
+        for text in texts
+    ]
+
+
+def cached_checks(
+    cache: Union[LRUCache, SQLiteCache, TieredCache],
+    scope: Any,
+    prompt: Union[str, List[str]],
+    request: Callable[[Union[str, List[str]]], Dict[str, Any]]
+) -> Dict[str, Any]:
+    """
+    Returns a guardrail response for one or a list of prompts, sending only
+    the prompts without a cached result. Cached and new results are merged
+    into one response with checks in prompt order.
+
+    :param cache: The cache holding the result of every prompt.
+    :param scope: JSON serializable API path and parameters the results depend on.
+    :param prompt: The prompt or list of prompts to check.
+    :param request: Callable sending a prompt or list of prompts to the API.
+    :return: A response in the format of the guardrail API.
+    """
+
+    prompts = [prompt] if type(prompt) is str else list(prompt)
+    keys = content_keys(scope, prompts)
+    results = cache.get_many(keys)
+
+    missing = {}
+    for key, text, result in zip(keys, prompts, results):
+        if result is None and key not in missing:
+            missing[key] = text
+
+    if missing:
+        texts = list(missing.values())
+        response = request(texts[0] if type(prompt) is str else texts)
+
+        fetched = {}
+        for key, part in zip(missing, split_checks(response, len(texts))):
+            cache.set(key, part)
+            fetched[key] = part
+
+        results = [
+            result if result is not None else fetched[key]
+            for key, result in zip(keys, results)
+        ]
+
+    return copy.deepcopy(merge_checks(results))
+
+
+def response_key(path: str, payload: Dict[str, Any]) -> str:
+    """
+    Returns the response cache key of a request payload. Streaming options
+    are left out, so a streamed and a regular request share an entry.
+
+    :param path: The API path the payload is sent to.
+    :param payload: The request payload dictionary.
+    """
+
+    payload = {
+        key: value for key, value in payload.items() if key not in ("stream", "stream_options")
+    }
+    canonical = json.dumps([path, payload], sort_keys=True, separators=(",", ":"))
+
+    return hashlib.sha256(canonical.encode("utf-8")).hexdigest()
+
+
+def cached_response(
+    cache: Union[LRUCache, SQLiteCache],
+    key: str,
+    stream: bool,
+    request: Callable[[], Dict[str, Any]],
+    request_stream: Callable[[], Iterator[Dict[str, Any]]],
+    to_chunks: Callable[[Dict[str, Any]], List[Dict[str, Any]]]
+) -> Any:
+    """
+    Returns the cached response for key, or makes the request and caches its
+    result. Streams are stored once they have been read to the end and are
+    replayed chunk by chunk. A cached regular response is replayed as a
+    stream through to_chunks when a stream is asked for.
+
+    :param cache: The LRUCache or SQLiteCache holding responses.
+    :param key: The cache key, see response_key.
+    :param stream: Whether a stream of chunks is returned.
+    :param request: Callable making the regular request.
+    :param request_stream: Callable making the streaming request.
+    :param to_chunks: Callable turning a regular response into stream chunks.
+    :return: The response dictionary, or an iterator of stream chunks.
+    """
+
+    entry = cache.get(key)
+
+    if not stream:
+        if entry is None or entry["kind"] != "response":
+            entry = {"kind": "response", "value": request()}
+            cache.set(key, copy.deepcopy(entry))
+        return copy.deepcopy(entry["value"])
+
+    if entry is None:
+        return _record_stream(cache, key, request_stream())
+
+    if entry["kind"] == "stream":
+        return iter(copy.deepcopy(entry["value"]))
+    return iter(to_chunks(copy.deepcopy(entry["value"])))
+
+
+def _record_stream(cache, key, chunks):
+    recorded = []
+    for chunk in chunks:
+        recorded.append(copy.deepcopy(chunk))
+        yield chunk
+
+    # Only streams that were read to the end are cached.
+    cache.set(key, {"kind": "stream", "value": recorded})
+
+
+class EmbeddingsCache:
+    """
+    EmbeddingsCache stores embedding vectors keyed by model, truncation
+    settings and a hash of the input content. Recent vectors are kept in an
+    in-memory LRU tier. When a path is given, every vector is also appended to
+    an on-disk tier made of one memory-mapped float32 file per vector size and
+    an append-only hash index, so disk hits are returned as zero-copy views.
+
+    Vectors are stored as float32. Processes sharing the on-disk tier take a
+    lock file for every append, so several may write it; vectors written by
+    other processes are seen after reopening the cache. On platforms without
+    fcntl, only one process may write it at a time.
+
+    Usage::
+
+        from predictionguard import PredictionGuard
+        from predictionguard.src.cache import EmbeddingsCache
+
+        client = PredictionGuard()
+        cache = EmbeddingsCache(path="embeddings-cache")
+
+        response = client.embeddings.create_batch(
+            model="bge-m3",
+            input=["First chunk", "Second chunk"],
+            cache=cache
+        )
+    """
+
+    def __init__(self, path: Optional[str] = None, max_items: int = 100000):
+        """
+        :param path: Directory for the on-disk tier, or None for a memory only cache.
+        :param max_items: Maximum number of vectors kept in the in-memory tier.
+        """
+
+        self.memory = LRUCache(max_items=max_items)
+        self.path = path
+
+        self._lock = threading.Lock()
+        self._index = {}
+        self._rows = {}
+        self._maps = {}
+
+        if path is not None:
+            os.makedirs(path, exist_ok=True)
+            self._load_index()
+
+    def key(self, model: str, input: Any, truncate: bool, truncation_direction: str) -> str:
+        """
+        Returns the cache key for a single embeddings input.
+        """
+
+        if type(input) is not str:
+            input = json.dumps(input, sort_keys=True, separators=(",", ":"))
+
+        content = hashlib.sha256(input.encode("utf-8")).hexdigest()
+        scope = json.dumps([model, bool(truncate), truncation_direction.lower()])
+
+        return hashlib.sha256((scope + content).encode("utf-8")).hexdigest()
+
+    def get(self, key: str) -> Optional[Any]:
+        """
+        Returns the float32 vector stored for key, or None on a miss.
+        """
+
+        vector = self.memory.get(key)
+        if vector is not None or self.path is None:
+            return vector
+
+        with self._lock:
+            location = self._index.get(key)
+            if location is None:
+                return None
+            vector = self._read(*location)
+
+        self.memory.set(key, vector)
+        return vector
+
+    def get_many(self, keys: Sequence[str]) -> List[Optional[Any]]:
+        """
+        Returns the vectors stored for keys, with None for every miss.
+        """
+
+        return [self.get(key) for key in keys]
+
+    def put(self, key: str, vector: Any) -> None:
+        """
+        Stores a vector for key in the in-memory tier and, if enabled, on disk.
+        """
+
+        np = import_numpy()
+        vector = np.asarray(vector, dtype=np.float32)
+
+        if self.path is not None:
+            with self._lock:
+                if key not in self._index:
+                    self._index[key] = self._append(key, vector)
+
+        self.memory.set(key, vector)
+
+    def put_many(self, keys: Sequence[str], vectors: Sequence[Any]) -> None:
+        for key, vector in zip(keys, vectors):
+            self.put(key, vector)
+
+    def _vectors_path(self, dim):
+        return os.path.join(self.path, "vectors-%d.f32" % dim)
+
+    def _load_index(self):
+        """
+        Function to rebuild the hash index from the on-disk log.
+        """
+
+        index_path = os.path.join(self.path, "index.log")
+        if not os.path.exists(index_path):
+            return
+
+        with open(index_path, "r") as index_file:
+            for line in index_file:
+                parts = line.split()
+                # A partially written last line is ignored.
+                if len(parts) != 3:
+                    continue
+                key, dim, row = parts[0], int(parts[1]), int(parts[2])
+                self._index[key] = (dim, row)
+
+        for dim in set(dim for dim, _ in self._index.values()):
+            self._rows[dim] = os.path.getsize(self._vectors_path(dim)) // (4 * dim)
+
+    def _append(self, key, vector):
+        """
+        Function to append a vector to its data file and record it in the index log.
+        """
+
+        dim = vector.shape[0]
+
+        with open(os.path.join(self.path, "lock"), "a") as lock_file:
+            if fcntl is not None:
+                fcntl.flock(lock_file, fcntl.LOCK_EX)
+            # The row comes from the data file itself, since other processes
+            # may have appended to it. The lock is released on close.
+            with open(self._vectors_path(dim), "ab") as vectors_file:
+                row = os.fstat(vectors_file.fileno()).st_size // (4 * dim)
+                vectors_file.write(vector.astype("<f4").tobytes())
+            with open(os.path.join(self.path, "index.log"), "a") as index_file:
+                index_file.write("%s %d %d\n" % (key, dim, row))
+
+        self._rows[dim] = max(self._rows.get(dim, 0), row + 1)
+        return dim, row
+
+    def _read(self, dim, row):
+        """
+        Function to return a read-only view of a stored vector.
+        """
+
+        np = import_numpy()
+
+        mapped = self._maps.get(dim)
+        if mapped is None or mapped.shape[0] <= row:
+            # Remap once the data file has grown past the current mapping.
+            mapped = np.memmap(
+                self._vectors_path(dim), dtype="<f4", mode="r", shape=(self._rows[dim], dim)
+            )
+            self._maps[dim] = mapped
+
+        return mapped[row]
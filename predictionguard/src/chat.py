@@ -4,12 +4,13 @@ import os
 import base64
 
 import requests
-from typing import Any, Dict, List, Optional, Union
+from typing import Any, Callable, Dict, List, Optional, Union
 import urllib.request
 import urllib.parse
 import uuid
 from warnings import warn
 
+from .cache import LRUCache, SQLiteCache, cached_response, response_key
 from ..version import __version__
 
 
@@ -79,6 +80,8 @@ class ChatCompletions:
         self.api_key = api_key
         self.url = url
         self.timeout = timeout
+        # Off by default, since sampled generations differ between calls.
+        self.single_flight = None
 
     def create(
         self,
@@ -115,6 +118,9 @@ class ChatCompletions:
         tools: Optional[List[Dict[str, Union[str, Dict[str, str]]]]] = None,
         top_p: Optional[float] = 0.99,
         top_k: Optional[float] = 50,
+        raw: Optional[bool] = False,
+        raw_hook: Optional[Callable[[bytes], None]] = None,
+        cache: Optional[Union[LRUCache, SQLiteCache]] = None,
     ) -> Dict[str, Any]:
         """
         Creates a chat request for the Prediction Guard /chat API.
@@ -138,7 +144,10 @@ class ChatCompletions:
         :param tools: Options to pass to the tool choice.
         :param top_p: The sampling for the model to use.
         :param top_k: The Top-K sampling for the model to use.
-        :return: A dictionary containing the chat response.
+        :param raw: Return the upstream response body (or SSE frames when streaming) as unparsed bytes.
+        :param raw_hook: Callable invoked with each raw SSE frame or response body before it is returned.
+        :param cache: Optional LRUCache or SQLiteCache of responses keyed by the request payload. Meant for deterministic requests, e.g. with temperature=0.
+        :return: A dictionary containing the chat response, or the raw bytes when raw is set.
         """
 
         # Handling max_tokens and returning deprecation message
@@ -170,7 +179,10 @@ class ChatCompletions:
             tool_choice,
             tools,
             top_p,
-            top_k
+            top_k,
+            raw,
+            raw_hook,
+            cache
         )
 
         # Run _generate_chat
@@ -198,6 +210,9 @@ class ChatCompletions:
         tools,
         top_p,
         top_k,
+        raw=False,
+        raw_hook=None,
+        cache=None,
     ):
         """
         Function to generate a single chat response.
@@ -226,6 +241,62 @@ class ChatCompletions:
                     pass
                 raise ValueError("Could not make prediction. " + err)
 
+        def return_raw(url, headers, payload, timeout, hook):
+            response = requests.request(
+                "POST", url + "/chat/completions", headers=headers, data=payload, timeout=timeout
+            )
+            # Hand back the body untouched so it can be relayed as is.
+            if response.status_code == 200:
+                if hook is not None:
+                    hook(response.content)
+                return response.content
+            elif response.status_code == 429:
+                raise ValueError(
+                    "Could not connect to Prediction Guard API. "
+                    "Too many requests, rate limit or quota exceeded."
+            )
+            else:
+                err = ""
+                try:
+                    err = response.json()["error"]
+                except Exception:
+                    pass
+                raise ValueError("Could not make prediction. " + err)
+
+        def raw_stream_generator(url, headers, payload, timeout, hook):
+            with requests.post(
+                url + "/chat/completions",
+                headers=headers,
+                data=payload,
+                stream=True,
+                timeout=timeout,
+            ) as response:
+                response.raise_for_status()
+
+                # Split the byte stream on SSE frame boundaries without
+                # decoding, so every frame is yielded exactly as received.
+                buffer = bytearray()
+                for chunk in response.iter_content(chunk_size=None):
+                    buffer += chunk
+                    while True:
+                        end, size = buffer.find(b"\n\n"), 2
+                        crlf_end = buffer.find(b"\r\n\r\n")
+                        if crlf_end != -1 and (end == -1 or crlf_end < end):
+                            end, size = crlf_end, 4
+                        if end == -1:
+                            break
+                        frame = bytes(buffer[:end + size])
+                        del buffer[:end + size]
+                        if hook is not None:
+                            hook(frame)
+                        yield frame
+
+                if buffer:
+                    frame = bytes(buffer)
+                    if hook is not None:
+                        hook(frame)
+                    yield frame
+
         def stream_generator(url, headers, payload, stream, timeout):
             with requests.post(
                 url + "/chat/completions",
@@ -254,6 +325,25 @@ class ChatCompletions:
                             else:
                                 yield dict_return
 
+        def response_chunks(response):
+            # Replays a cached response in the shape of streamed chunks.
+            return [
+                {
+                    "data": {
+                        "id": response.get("id"),
+                        "object": "chat.completion.chunk",
+                        "created": response.get("created"),
+                        "model": response.get("model"),
+                        "choices": [{
+                            "index": choice.get("index", 0),
+                            "delta": {"content": choice["message"]["content"]},
+                            "finish_reason": choice.get("finish_reason")
+                        }]
+                    }
+                }
+                for choice in response["choices"]
+            ]
+
         headers = {
             "Content-Type": "application/json",
             "Authorization": "Bearer " + self.api_key,
@@ -351,9 +441,33 @@ class ChatCompletions:
 
         payload = json.dumps(payload_dict)
 
+        if cache is not None:
+            if raw:
+                raise ValueError("The response cache can not be used with raw responses.")
+            return cached_response(
+                cache,
+                response_key("/chat/completions", payload_dict),
+                stream,
+                lambda: return_dict(self.url, headers, payload, self.timeout),
+                lambda: stream_generator(self.url, headers, payload, stream, self.timeout),
+                response_chunks
+            )
+
+        if raw:
+            if stream:
+                return raw_stream_generator(self.url, headers, payload, self.timeout, raw_hook)
+            else:
+                return return_raw(self.url, headers, payload, self.timeout, raw_hook)
+
         if stream:
             return stream_generator(self.url, headers, payload, stream, self.timeout)
 
+        elif self.single_flight is not None:
+            return self.single_flight.do(
+                (self.url + "/chat/completions", payload),
+                lambda: return_dict(self.url, headers, payload, self.timeout)
+            )
+
         else:
             return return_dict(self.url, headers, payload, self.timeout)
 
@@ -0,0 +1,131 @@
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Iterator, List, Optional, Sequence
+
+
+def is_column(column: Any) -> bool:
+    """
+    Returns whether column is a single pandas/Polars Series or a sequence,
+    as opposed to an iterator of column chunks.
+    """
+
+    return hasattr(column, "to_list") or isinstance(column, (list, tuple))
+
+
+def column_values(column: Any) -> List[Any]:
+    """
+    Returns the values of a pandas/Polars Series, or any sequence, as a list.
+    """
+
+    if hasattr(column, "to_list"):
+        return column.to_list()
+    return list(column)
+
+
+def like_column(column: Any, values: List[Any], name: Optional[str] = None) -> Any:
+    """
+    Wraps values in a column of the same kind as column, aligned to its index.
+    """
+
+    module = type(column).__module__.split(".")[0]
+
+    if module == "pandas":
+        import pandas
+
+        return pandas.Series(values, index=column.index, name=name or column.name)
+    elif module == "polars":
+        import polars
+
+        return polars.Series(name or column.name, values)
+
+    return values
+
+
+def map_column(
+    column: Any,
+    function: Callable[[List[Any]], List[Any]],
+    chunk_size: int,
+    progress: Optional[Callable[[int, Optional[int]], None]] = None,
+    name: Optional[str] = None
+) -> Any:
+    """
+    Applies function to the values of a column chunk_size rows at a time and
+    returns an aligned column of the results. When column is an iterator of
+    column chunks, such as one produced by a chunked CSV reader, an iterator
+    of result columns is returned instead so the input never has to fit in
+    memory at once.
+
+    :param column: A pandas/Polars Series, a sequence, or an iterator of either.
+    :param function: Callable mapping a list of values to a list of results.
+    :param chunk_size: Number of rows handed to function at once.
+    :param progress: Optional callable invoked with (rows done, total rows or None).
+    :param name: Name of the result column. Defaults to the input column name.
+    :return: A column of results of the same kind as column.
+    """
+
+    if chunk_size < 1:
+        raise ValueError("Please enter a chunk_size of at least 1.")
+
+    if not is_column(column):
+        return _map_chunks(iter(column), function, chunk_size, progress, name)
+
+    values = column_values(column)
+    results = []
+    for start in range(0, len(values), chunk_size):
+        results.extend(function(values[start:start + chunk_size]))
+        if progress is not None:
+            progress(len(results), len(values))
+
+    return like_column(column, results, name)
+
+
+def _map_chunks(chunks, function, chunk_size, progress, name) -> Iterator[Any]:
+    done = 0
+    for chunk in chunks:
+        values = column_values(chunk)
+        results = []
+        for start in range(0, len(values), chunk_size):
+            results.extend(function(values[start:start + chunk_size]))
+            if progress is not None:
+                progress(done + len(results), None)
+
+        done += len(results)
+        yield like_column(chunk, results, name)
+
+
+def map_parallel(
+    values: Sequence[Any],
+    function: Callable[[Any], Any],
+    max_workers: int
+) -> List[Any]:
+    """
+    Applies function to every value with up to max_workers concurrent calls,
+    keeping the input order.
+    """
+
+    if max_workers < 1:
+        raise ValueError("Please enter a max_workers value of at least 1.")
+
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        return list(executor.map(function, values))
+
+
+def map_batches(
+    values: Sequence[Any],
+    function: Callable[[List[Any]], List[Any]],
+    batch_size: int,
+    max_workers: int
+) -> List[Any]:
+    """
+    Splits values into batches of batch_size, applies function to the
+    batches concurrently and flattens the results back into input order.
+    """
+
+    if batch_size < 1:
+        raise ValueError("Please enter a batch_size of at least 1.")
+
+    batches = [values[start:start + batch_size] for start in range(0, len(values), batch_size)]
+
+    results = []
+    for batch_results in map_parallel(batches, function, max_workers):
+        results.extend(batch_results)
+    return results
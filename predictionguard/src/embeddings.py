@@ -2,16 +2,98 @@ import re
 import json
 import os
 import base64
+import random
+import time
 
 import requests
-from typing import Any, Dict, List, Union, Optional
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Tuple, Union, Optional
 import urllib.request
 import urllib.parse
 import uuid
+from array import array
+import sys
 
+from .cache import EmbeddingsCache
+from .columns import map_column
+from .near_duplicates import NearDuplicateDetector
+from .optional import import_numpy, import_pyarrow
+from .quantize import quantize_binary, quantize_int8
+from .shared import SharedEmbeddings
+from .single_flight import SingleFlight
 from ..version import __version__
 
 
+_EMBEDDING_PATTERN = re.compile(rb'"embedding"\s*:\s*(?:\[([^\]]*)\]|"([^"]*)")')
+_INDEX_PATTERN = re.compile(rb'"index"\s*:\s*(\d+)')
+
+# Seconds before the first retry of a failed batch, doubled on every
+# further attempt up to _MAX_RETRY_DELAY.
+_RETRY_DELAY = 0.5
+_MAX_RETRY_DELAY = 30.0
+
+
+class _RequestError(ValueError):
+    """
+    A ValueError raised for an unsuccessful API response, carrying its
+    status code and Retry-After header so failed batches can be retried.
+    """
+
+    def __init__(self, message, status_code, retry_after=None):
+        super().__init__(message)
+        self.status_code = status_code
+        self.retry_after = retry_after
+
+
+class _CachedBatch(list):
+    """
+    A chunk of (row, vector) cache hits, passed along with the batches of
+    misses so that hits are released in turn without a request.
+    """
+
+    def __init__(self, ordered):
+        super().__init__()
+        self.ordered = ordered
+
+
+def _add_usage(total: Optional[Dict[str, Any]], usage: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Function to add the token counts of a batch response to the running
+    usage totals of a batched call.
+    """
+
+    if total is None:
+        return dict(usage)
+
+    for key, value in usage.items():
+        if type(value) in (int, float) and type(total.get(key)) in (int, float):
+            total[key] += value
+        else:
+            total.setdefault(key, value)
+    return total
+
+
+def _retry_delay(error: BaseException, attempts: int) -> Optional[float]:
+    """
+    Function to return the seconds to wait before retrying a batch that
+    failed with error after attempts retries, or None when it should not be
+    retried. Connection errors, rate limits and server errors are retried;
+    client errors such as invalid input are not.
+    """
+
+    if isinstance(error, _RequestError):
+        if error.status_code != 429 and error.status_code < 500:
+            return None
+    elif not isinstance(error, requests.exceptions.RequestException):
+        return None
+
+    delay = min(_RETRY_DELAY * 2 ** attempts, _MAX_RETRY_DELAY)
+    if getattr(error, "retry_after", None) is not None:
+        delay = max(delay, error.retry_after)
+    # Jitter spreads out the retries of batches that failed together.
+    return delay * random.uniform(0.5, 1.0)
+
+
 class Embeddings:
     """
     Embedding generates chat completions based on a conversation history.
@@ -50,6 +132,10 @@ class Embeddings:
         self.api_key = api_key
         self.url = url
         self.timeout = timeout
+        self.single_flight = SingleFlight()
+        # Whether the server answers base64 requests with packed vectors,
+        # or None until a base64 response has been seen.
+        self._base64_supported = None
 
     def create(
         self,
@@ -66,6 +152,9 @@ class Embeddings:
         ],
         truncate: bool = False,
         truncation_direction: str = "right",
+        return_type: str = "dict",
+        out: Optional[Any] = None,
+        encoding_format: str = "float",
     ) -> Dict[str, Any]:
         """
         Creates an embeddings request to the Prediction Guard /embeddings API
@@ -74,28 +163,889 @@ class Embeddings:
         :param input: String, list of strings, or list of dictionaries containing input data with text and image keys.
         :param truncate: Whether to truncate input text.
         :param truncation_direction: Direction to truncate input text.
+        :param return_type: "dict" for the API response, or "numpy" for an (n, dim) float32 array.
+        :param out: Optional preallocated float32 array to write the "numpy" result into.
+        :param encoding_format: "float" for JSON number vectors, or "base64" for packed float32 vectors on the wire.
         :result:
         """
 
         # Create a list of tuples, each containing all the parameters for
         # a call to _generate_translation
-        args = (model, input, truncate, truncation_direction)
+        args = (model, input, truncate, truncation_direction, return_type, out, encoding_format)
 
         # Run _generate_embeddings
         choices = self._generate_embeddings(*args)
         return choices
 
-    def _generate_embeddings(self, model, input, truncate, truncation_direction):
+    def create_batch(
+        self,
+        model: str,
+        input: List[
+            Union[
+                str,
+                List[int],
+                Dict[str, str]
+            ]
+        ],
+        truncate: bool = False,
+        truncation_direction: str = "right",
+        batch_size: int = 64,
+        max_batch_bytes: int = 1000000,
+        max_workers: int = 4,
+        max_retries: int = 2,
+        return_type: str = "dict",
+        out: Optional[Any] = None,
+        encoding_format: str = "float",
+        cache: Optional[EmbeddingsCache] = None,
+        deduplicate: bool = True,
+        bucket_by_length: bool = True,
+        quantize: Optional[str] = None,
+        shared_path: Optional[str] = None,
+        near_duplicates: Optional[NearDuplicateDetector] = None,
+    ) -> Dict[str, Any]:
+        """
+        Creates embeddings for an arbitrarily large list of inputs by splitting it
+        into batches that are sent to the /embeddings API concurrently.
+
+        :param model: Model to use for embeddings
+        :param input: List of strings, token lists, or dictionaries containing input data with text and image keys.
+        :param truncate: Whether to truncate input text.
+        :param truncation_direction: Direction to truncate input text.
+        :param batch_size: Maximum number of inputs sent in a single request.
+        :param max_batch_bytes: Maximum serialized size of the inputs sent in a single request.
+        :param max_workers: Maximum number of requests in flight at once.
+        :param max_retries: Number of times a batch failing with a rate limit, server or connection error is retried, with exponential backoff, before giving up.
+        :param return_type: "dict" for the API response, "numpy" for an (n, dim) float32 array, or "shared_memory" for a SharedEmbeddings handle.
+        :param out: Optional preallocated float32 array to write the "numpy" result into.
+        :param encoding_format: "float" for JSON number vectors, or "base64" for packed float32 vectors on the wire.
+        :param cache: Optional EmbeddingsCache checked before sending, so that only misses are requested.
+        :param deduplicate: Whether to embed repeated inputs once and copy the result to each position.
+        :param bucket_by_length: Whether to batch inputs of similar estimated token counts together.
+        :param quantize: With return_type="numpy", "int8" returns (codes, scales) and "binary" returns packed sign bits.
+        :param shared_path: With return_type="shared_memory", write to a memory-mapped file at this path instead.
+        :param near_duplicates: Optional NearDuplicateDetector; near-duplicate text inputs are embedded once and share the vector.
+        :return: A dictionary in the /embeddings response format, with data in input order.
+        """
+
+        if type(input) is not list:
+            input = [input]
+
+        if return_type == "shared_memory":
+            if out is not None:
+                raise ValueError("The out buffer can not be used with return_type='shared_memory'.")
+        else:
+            self._check_return_type(return_type, out, len(input))
+        self._check_quantize(quantize, return_type, out)
+        payload_dict = self._base_payload(model, truncate, truncation_direction, encoding_format)
+
+        rows = list(enumerate(input))
+        duplicates = {}
+        if deduplicate:
+            rows, duplicates = self._deduplicate(rows)
+        if near_duplicates is not None:
+            rows, duplicates = self._collapse_near_duplicates(rows, duplicates, near_duplicates)
+        if bucket_by_length:
+            # Similar lengths in one request keep the server from padding
+            # short inputs up to the longest one in the batch.
+            rows.sort(key=lambda row: self._estimate_tokens(row[1]))
+
+        results = self._embed_rows(
+            rows,
+            payload_dict,
+            batch_size,
+            max_batch_bytes,
+            max_workers,
+            max_retries,
+            parse=return_type == "dict",
+            cache=cache
+        )
+
+        if return_type == "shared_memory":
+            handle = out = None
+            try:
+                for row, vector, _ in results:
+                    if handle is None:
+                        handle = SharedEmbeddings.create((len(input), len(vector)), path=shared_path)
+                        out = handle.attach()
+                    out[row] = vector
+                    for duplicate in duplicates.get(row, ()):
+                        out[duplicate] = vector
+            except BaseException:
+                # Free the block or file when embedding fails partway.
+                if handle is not None:
+                    out = None
+                    handle.unlink()
+                    if shared_path is not None:
+                        os.remove(shared_path)
+                raise
+
+            if handle is None:
+                return SharedEmbeddings.create((0, 0), path=shared_path)
+
+            # Only the handle is returned; the consumer attaches by name.
+            if shared_path is not None:
+                out.flush()
+            del out
+            handle.close()
+            return handle
+
+        if quantize is not None:
+            return self._collect_quantized(results, len(input), duplicates, quantize)
+
+        if return_type == "numpy":
+            for row, vector, _ in results:
+                if out is None:
+                    out = import_numpy().empty((len(input), len(vector)), dtype="float32")
+                out[row] = vector
+                for duplicate in duplicates.get(row, ()):
+                    out[duplicate] = vector
+
+            if out is None:
+                out = import_numpy().empty((0, 0), dtype="float32")
+            return out
+
+        ret = None
+        usage = None
+        last = None
+        data = [None] * len(input)
+        for row, item, response in results:
+            # The rows of one response arrive together, so each batch's
+            # usage is added once. Cache hits come without a response.
+            if response is not None and response is not last:
+                last = response
+                if ret is None:
+                    ret = {key: value for key, value in response.items() if key != "data"}
+                if response.get("usage") is not None:
+                    usage = _add_usage(usage, response["usage"])
+            data[row] = item
+            for duplicate in duplicates.get(row, ()):
+                data[duplicate] = dict(item, index=duplicate)
+
+        if ret is None:
+            ret = {"object": "list", "model": model}
+        if usage is not None:
+            ret["usage"] = usage
+        ret["data"] = data
+        return ret
+
+    def create_column(
+        self,
+        model: str,
+        column: Any,
+        return_type: str = "list",
+        chunk_size: int = 10000,
+        progress: Optional[Callable[[int, Optional[int]], None]] = None,
+        **kwargs: Any
+    ) -> Any:
+        """
+        Embeds every value of a pandas/Polars Series, using create_batch on
+        chunk_size rows at a time, and returns an aligned Series of vectors.
+
+        Usage::
+
+            df["embedding"] = client.embeddings.create_column("bge-m3", df["text"])
+
+        :param model: Model to use for embeddings
+        :param column: A pandas/Polars Series or list of inputs, or an iterator of them for data larger than memory.
+        :param return_type: "list" for lists of floats, or "numpy" for float32 arrays.
+        :param chunk_size: Number of rows embedded per create_batch call.
+        :param progress: Optional callable invoked with (rows done, total rows or None).
+        :param kwargs: Further options passed on to create_batch.
+        :return: A Series of the same kind as column, or an iterator of them.
+        """
+
+        if return_type not in ("list", "numpy"):
+            raise ValueError("Please enter either 'list' or 'numpy' for the return_type value.")
+
+        def embed(values):
+            if return_type == "numpy":
+                return list(self.create_batch(model, values, return_type="numpy", **kwargs))
+            response = self.create_batch(model, values, **kwargs)
+            return [item["embedding"] for item in response["data"]]
+
+        return map_column(column, embed, chunk_size, progress, name="embedding")
+
+    def iter_embed(
+        self,
+        model: str,
+        input: Iterable[
+            Union[
+                str,
+                List[int],
+                Dict[str, str]
+            ]
+        ],
+        truncate: bool = False,
+        truncation_direction: str = "right",
+        batch_size: int = 64,
+        max_batch_bytes: int = 1000000,
+        max_in_flight: int = 4,
+        max_retries: int = 2,
+        ordered: bool = True,
+        return_type: str = "list",
+        encoding_format: str = "float",
+        cache: Optional[EmbeddingsCache] = None,
+        quantize: Optional[str] = None,
+    ) -> Iterator[Tuple[int, Any]]:
+        """
+        Lazily embeds inputs pulled from any iterable, such as a generator
+        reading from disk, yielding (index, vector) pairs as batches complete.
+        Only a bounded number of batches is held at any time, so memory stays
+        constant regardless of the number of inputs.
+
+        Usage::
+
+            def read_chunks(path):
+                with open(path) as chunks:
+                    for line in chunks:
+                        yield line.strip()
+
+            for index, vector in client.embeddings.iter_embed("bge-m3", read_chunks("corpus.txt")):
+                store(index, vector)
+
+        :param model: Model to use for embeddings
+        :param input: Iterable of strings, token lists, or dictionaries containing input data with text and image keys.
+        :param truncate: Whether to truncate input text.
+        :param truncation_direction: Direction to truncate input text.
+        :param batch_size: Maximum number of inputs sent in a single request.
+        :param max_batch_bytes: Maximum serialized size of the inputs sent in a single request.
+        :param max_in_flight: Maximum number of requests in flight at once.
+        :param max_retries: Number of times a batch failing with a rate limit, server or connection error is retried, with exponential backoff, before giving up.
+        :param ordered: Whether to yield vectors in input order, or as soon as each batch completes.
+        :param return_type: "list" for lists of floats, or "numpy" for float32 arrays.
+        :param encoding_format: "float" for JSON number vectors, or "base64" for packed float32 vectors on the wire.
+        :param cache: Optional EmbeddingsCache checked before sending, so that only misses are requested.
+        :param quantize: With return_type="numpy", "int8" yields (codes, scale) and "binary" yields packed sign bits.
+        :return: An iterator of (index, vector) tuples.
+        """
+
+        if return_type not in ("list", "numpy"):
+            raise ValueError("Please enter either 'list' or 'numpy' for the return_type value.")
+        self._check_quantize(quantize, return_type, None)
+
+        payload_dict = self._base_payload(model, truncate, truncation_direction, encoding_format)
+
+        results = self._embed_rows(
+            enumerate(input),
+            payload_dict,
+            batch_size,
+            max_batch_bytes,
+            max_in_flight,
+            max_retries,
+            parse=return_type == "list",
+            cache=cache,
+            ordered=ordered
+        )
+
+        def convert(result):
+            if return_type == "list":
+                return result["embedding"]
+            elif quantize == "int8":
+                return quantize_int8(result)
+            elif quantize == "binary":
+                return quantize_binary(result)
+            return result
+
+        if not ordered:
+            for row, result, _ in results:
+                yield row, convert(result)
+            return
+
+        # Batches arrive in input order but rows within a batch may not, so
+        # rows are released from a reorder buffer of at most one batch.
+        held = {}
+        expected = 0
+        for row, result, _ in results:
+            held[row] = convert(result)
+            while expected in held:
+                yield expected, held.pop(expected)
+                expected += 1
+
+    def iter_arrow(
+        self,
+        model: str,
+        input: Iterable[
+            Union[
+                str,
+                List[int],
+                Dict[str, str]
+            ]
+        ],
+        ids: Optional[Iterable[Any]] = None,
+        include_input: bool = True,
+        truncate: bool = False,
+        truncation_direction: str = "right",
+        batch_size: int = 64,
+        max_batch_bytes: int = 1000000,
+        max_in_flight: int = 4,
+        max_retries: int = 2,
+        encoding_format: str = "float",
+        cache: Optional[EmbeddingsCache] = None,
+    ) -> Iterator[Any]:
+        """
+        Lazily embeds inputs and yields the results as Arrow RecordBatches of
+        up to batch_size rows, with "id", optional "input" and a fixed size
+        list float32 "embedding" column.
+
+        :param model: Model to use for embeddings
+        :param input: Iterable of strings, token lists, or dictionaries containing input data with text and image keys.
+        :param ids: Optional iterable of ids aligned with input. Defaults to the input position.
+        :param include_input: Whether to add the input as a string column.
+        :param truncate: Whether to truncate input text.
+        :param truncation_direction: Direction to truncate input text.
+        :param batch_size: Maximum number of inputs sent in a single request and rows per RecordBatch.
+        :param max_batch_bytes: Maximum serialized size of the inputs sent in a single request.
+        :param max_in_flight: Maximum number of requests in flight at once.
+        :param max_retries: Number of times a batch failing with a rate limit, server or connection error is retried, with exponential backoff, before giving up.
+        :param encoding_format: "float" for JSON number vectors, or "base64" for packed float32 vectors on the wire.
+        :param cache: Optional EmbeddingsCache checked before sending, so that only misses are requested.
+        :return: An iterator of pyarrow.RecordBatch.
+        """
+
+        pa = import_pyarrow()
+        np = import_numpy()
+
+        # Ids and inputs are only kept for the rows that are still in flight.
+        pending_ids = {}
+        pending_inputs = {}
+
+        def track(input):
+            id_iter = iter(ids) if ids is not None else None
+            for row, item in enumerate(input):
+                pending_ids[row] = next(id_iter) if id_iter is not None else row
+                if include_input:
+                    pending_inputs[row] = item if type(item) is str else json.dumps(item)
+                yield item
+
+        def record_batch(rows, vectors):
+            matrix = np.stack(vectors)
+            columns = [pa.array([pending_ids.pop(row) for row in rows])]
+            names = ["id"]
+            if include_input:
+                columns.append(pa.array([pending_inputs.pop(row) for row in rows], type=pa.string()))
+                names.append("input")
+            columns.append(
+                pa.FixedSizeListArray.from_arrays(pa.array(matrix.ravel()), matrix.shape[1])
+            )
+            names.append("embedding")
+            return pa.RecordBatch.from_arrays(columns, names=names)
+
+        rows = []
+        vectors = []
+        for row, vector in self.iter_embed(
+            model,
+            track(input),
+            truncate=truncate,
+            truncation_direction=truncation_direction,
+            batch_size=batch_size,
+            max_batch_bytes=max_batch_bytes,
+            max_in_flight=max_in_flight,
+            max_retries=max_retries,
+            return_type="numpy",
+            encoding_format=encoding_format,
+            cache=cache
+        ):
+            rows.append(row)
+            vectors.append(vector)
+            if len(rows) >= batch_size:
+                yield record_batch(rows, vectors)
+                rows = []
+                vectors = []
+
+        if rows:
+            yield record_batch(rows, vectors)
+
+    def write_parquet(
+        self,
+        path: str,
+        model: str,
+        input: Iterable[
+            Union[
+                str,
+                List[int],
+                Dict[str, str]
+            ]
+        ],
+        ids: Optional[Iterable[Any]] = None,
+        include_input: bool = True,
+        compression: str = "zstd",
+        **kwargs: Any
+    ) -> int:
+        """
+        Embeds inputs and appends each completed RecordBatch from iter_arrow
+        to a Parquet file, so memory stays bounded for any number of inputs.
+
+        :param path: Path of the Parquet file to write.
+        :param model: Model to use for embeddings
+        :param input: Iterable of strings, token lists, or dictionaries containing input data with text and image keys.
+        :param ids: Optional iterable of ids aligned with input. Defaults to the input position.
+        :param include_input: Whether to add the input as a string column.
+        :param compression: Parquet compression codec.
+        :param kwargs: Further batching options passed on to iter_arrow.
+        :return: The number of rows written.
+        """
+
+        import_pyarrow()
+        import pyarrow.parquet
+
+        writer = None
+        rows = 0
+        try:
+            for batch in self.iter_arrow(
+                model, input, ids=ids, include_input=include_input, **kwargs
+            ):
+                if writer is None:
+                    writer = pyarrow.parquet.ParquetWriter(
+                        path, batch.schema, compression=compression
+                    )
+                writer.write_batch(batch)
+                rows += batch.num_rows
+        finally:
+            if writer is not None:
+                writer.close()
+
+        return rows
+
+    def _embed_rows(
+        self,
+        rows: Iterable[Tuple[int, Any]],
+        payload_dict: Dict[str, Any],
+        batch_size: int,
+        max_batch_bytes: int,
+        max_workers: int,
+        max_retries: int,
+        parse: bool = True,
+        cache: Optional[EmbeddingsCache] = None,
+        ordered: bool = False
+    ) -> Iterator[Tuple[int, Any, Optional[Dict[str, Any]]]]:
+        """
+        Function to embed (row, input) pairs, yielding (row, result, response)
+        as results become available. Results are response data items when
+        parse is set and float32 vectors otherwise; response is the parsed
+        response the result came from, or None.
+        """
+
+        keys = {}
+
+        # Ordered output sends the pending misses ahead of every chunk of
+        # hits, so larger chunks keep those requests full.
+        chunk_size = batch_size * max_workers if ordered else batch_size
+
+        def lookup(rows):
+            # Only misses are batched; hits are released in bounded chunks
+            # between the batches, so a warm cache never reads ahead.
+            hits = _CachedBatch(ordered)
+            for row, item in rows:
+                key = cache.key(
+                    payload_dict["model"],
+                    item,
+                    payload_dict["truncate"],
+                    payload_dict["truncation_direction"]
+                )
+                vector = cache.get(key)
+                if vector is None:
+                    keys[row] = key
+                    yield row, item
+                else:
+                    hits.append((row, vector))
+                    if len(hits) >= chunk_size:
+                        yield hits
+                        hits = _CachedBatch(ordered)
+
+            if hits:
+                yield hits
+
+        if cache is not None:
+            rows = lookup(rows)
+
+        batches = self._batch_inputs(rows, batch_size, max_batch_bytes)
+        for batch, response in self._run_batches(
+            batches, payload_dict, max_workers, max_retries, parse, ordered
+        ):
+            if response is None:
+                for row, vector in batch:
+                    if parse:
+                        yield row, {"object": "embedding", "embedding": vector.tolist(), "index": row}, None
+                    else:
+                        yield row, vector, None
+            elif parse:
+                for item in response["data"]:
+                    row = batch[item["index"]][0]
+                    if cache is not None:
+                        cache.put(keys.pop(row), item["embedding"])
+                    yield row, dict(item, index=row), response
+            else:
+                for index, vector in self._iter_vectors(response):
+                    row = batch[index][0]
+                    if cache is not None:
+                        cache.put(keys.pop(row), vector)
+                    yield row, vector, None
+
+    def _deduplicate(
+        self,
+        rows: List[Tuple[int, Any]]
+    ) -> Tuple[List[Tuple[int, Any]], Dict[int, List[int]]]:
+        """
+        Function to collapse identical inputs, returning the unique rows and a
+        map from each kept row to the rows that repeat it.
+        """
+
+        first_rows = {}
+        unique = []
+        duplicates = {}
+        for row, item in rows:
+            if type(item) is str:
+                key = item
+            else:
+                key = json.dumps(item, sort_keys=True)
+
+            first = first_rows.get(key)
+            if first is None:
+                first_rows[key] = row
+                unique.append((row, item))
+            else:
+                duplicates.setdefault(first, []).append(row)
+
+        return unique, duplicates
+
+    def _collapse_near_duplicates(
+        self,
+        rows: List[Tuple[int, Any]],
+        duplicates: Dict[int, List[int]],
+        detector: NearDuplicateDetector
+    ) -> Tuple[List[Tuple[int, Any]], Dict[int, List[int]]]:
+        """
+        Function to fold near-duplicate text rows, and the rows that repeat
+        them, into the rows of their representatives.
+        """
+
+        texts = [(row, item) for row, item in rows if type(item) is str]
+        groups = detector.group([item for _, item in texts])
+
+        folded = set()
+        for (row, _), representative in zip(texts, groups):
+            representative = texts[representative][0]
+            if representative != row:
+                duplicates.setdefault(representative, []).append(row)
+                duplicates[representative].extend(duplicates.pop(row, ()))
+                folded.add(row)
+
+        return [(row, item) for row, item in rows if row not in folded], duplicates
+
+    def _estimate_tokens(self, item: Any) -> int:
+        """
+        Function to roughly estimate the token count of an input.
+        """
+
+        if type(item) is str:
+            return len(item) // 4
+        elif type(item) is list:
+            return len(item)
+        elif type(item) is dict:
+            # Images are embedded at a fixed size, so only the text varies.
+            return len(item.get("text", "")) // 4
+        return 0
+
+    def _batch_inputs(
+        self,
+        items: Iterable[Tuple[int, Any]],
+        batch_size: int,
+        max_batch_bytes: int
+    ) -> Iterator[List[Tuple[int, Any]]]:
+        """
+        Function to group (index, input) pairs into batches bounded by item count and serialized size.
+        """
+
+        if batch_size < 1:
+            raise ValueError("Please enter a batch_size of at least 1.")
+
+        batch = []
+        batch_bytes = 0
+        for entry in items:
+            if isinstance(entry, _CachedBatch):
+                # Ordered output releases batches in sequence, so the misses
+                # read before the hits are sent now instead of holding them.
+                if entry.ordered and batch:
+                    yield batch
+                    batch = []
+                    batch_bytes = 0
+                yield entry
+                continue
+
+            index, item = entry
+            item_bytes = len(json.dumps(item))
+            if batch and (
+                len(batch) >= batch_size or batch_bytes + item_bytes > max_batch_bytes
+            ):
+                yield batch
+                batch = []
+                batch_bytes = 0
+            batch.append((index, item))
+            batch_bytes += item_bytes
+
+        if batch:
+            yield batch
+
+    def _run_batches(
+        self,
+        batches: Iterable[List[Tuple[int, Any]]],
+        payload_dict: Dict[str, Any],
+        max_workers: int,
+        max_retries: int,
+        parse: bool = True,
+        ordered: bool = False
+    ) -> Iterator[Tuple[List[Tuple[int, Any]], Union[Dict[str, Any], bytes, None]]]:
+        """
+        Function to send batches with bounded concurrency on a pooled connection,
+        yielding each batch together with its response as soon as it completes,
+        or in submission order when ordered is set. Chunks of cache hits are
+        not sent and are yielded with a response of None.
+        """
+
+        if max_workers < 1:
+            raise ValueError("Please enter a max_workers value of at least 1.")
+
+        session = requests.Session()
+        adapter = requests.adapters.HTTPAdapter(pool_maxsize=max_workers)
+        session.mount("http://", adapter)
+        session.mount("https://", adapter)
+
+        def serialize(batch):
+            if batch is None or isinstance(batch, _CachedBatch):
+                return None
+            return json.dumps(
+                dict(payload_dict, input=self._format_inputs([item for _, item in batch]))
+            )
+
+        executor = ThreadPoolExecutor(max_workers=max_workers)
+        try:
+            batches = iter(batches)
+            pending = {}
+            held = {}
+            submitted = 0
+            released = 0
+
+            # The next payload is serialized on this thread while the
+            # workers are busy with network I/O for the batches in flight.
+            next_batch = next(batches, None)
+            next_payload = serialize(next_batch)
+
+            while pending or next_batch is not None:
+                # Completed batches waiting on an earlier one count against
+                # the window too, so a slow batch cannot grow memory unbounded.
+                while (
+                    next_batch is not None
+                    and len(pending) < max_workers
+                    and len(pending) + len(held) < 2 * max_workers
+                ):
+                    if isinstance(next_batch, _CachedBatch):
+                        # Cache hits need no request; they wait only for
+                        # earlier batches when order is kept.
+                        if ordered and released < submitted:
+                            held[submitted] = (next_batch, None)
+                        else:
+                            yield next_batch, None
+                            if ordered:
+                                released += 1
+                    else:
+                        future = executor.submit(
+                            self._post_embeddings, next_payload, session, parse
+                        )
+                        pending[future] = (submitted, next_batch, next_payload, 0)
+                    submitted += 1
+                    next_batch = next(batches, None)
+                    next_payload = serialize(next_batch)
+
+                done = wait(pending, return_when=FIRST_COMPLETED)[0] if pending else ()
+                for future in done:
+                    sequence, batch, payload, attempts = pending.pop(future)
+                    try:
+                        response = future.result()
+                    except (ValueError, requests.exceptions.RequestException) as error:
+                        # Only the failed batch is retried, after waiting on
+                        # its worker so the other batches keep going.
+                        delay = _retry_delay(error, attempts)
+                        if delay is None or attempts >= max_retries:
+                            raise
+                        retry = executor.submit(
+                            self._retry_embeddings, delay, payload, session, parse
+                        )
+                        pending[retry] = (sequence, batch, payload, attempts + 1)
+                    else:
+                        if ordered:
+                            held[sequence] = (batch, response)
+                        else:
+                            yield batch, response
+
+                while released in held:
+                    yield held.pop(released)
+                    released += 1
+        finally:
+            executor.shutdown(wait=False, cancel_futures=True)
+            session.close()
+
+    def _check_return_type(self, return_type, out, rows):
+        """
+        Function to validate the requested output mode and any caller supplied buffer.
+        """
+
+        if return_type not in ("dict", "numpy"):
+            raise ValueError("Please enter either 'dict' or 'numpy' for the return_type value.")
+
+        if out is not None:
+            if return_type == "dict":
+                raise ValueError("The out buffer can only be used with return_type='numpy'.")
+            if (
+                out.dtype != import_numpy().float32
+                or out.ndim != 2
+                or out.shape[0] != rows
+            ):
+                raise ValueError(
+                    "The out buffer must be a float32 array of shape (%d, dim)." % rows
+                )
+
+    def _check_quantize(self, quantize, return_type, out):
+        """
+        Function to validate the requested quantization.
+        """
+
+        if quantize is None:
+            return
+        if quantize not in ("int8", "binary"):
+            raise ValueError("Please enter either 'int8' or 'binary' for the quantize value.")
+        if return_type != "numpy":
+            raise ValueError("Quantization is only supported with return_type='numpy'.")
+        if out is not None:
+            raise ValueError("The out buffer can not be used with quantization.")
+
+    def _collect_quantized(self, results, rows, duplicates, quantize):
+        """
+        Function to quantize vectors as they are decoded, so that no full
+        precision matrix of all the results is ever held.
+        """
+
+        np = import_numpy()
+
+        codes = None
+        scales = None
+        for row, vector, _ in results:
+            if quantize == "int8":
+                code, scale = quantize_int8(vector)
+                if codes is None:
+                    codes = np.zeros((rows, code.shape[0]), dtype=np.int8)
+                    scales = np.zeros(rows, dtype=np.float32)
+            else:
+                code = quantize_binary(vector)
+                if codes is None:
+                    codes = np.zeros((rows, code.shape[0]), dtype=np.uint8)
+
+            for target in (row, *duplicates.get(row, ())):
+                codes[target] = code
+                if scales is not None:
+                    scales[target] = scale
+
+        if codes is None:
+            codes = np.zeros((0, 0), dtype=np.int8 if quantize == "int8" else np.uint8)
+            scales = np.zeros(0, dtype=np.float32)
+
+        if quantize == "int8":
+            return codes, scales
+        return codes
+
+    def _iter_vectors(self, body):
+        """
+        Function to parse (index, float32 vector) pairs directly out of a raw
+        /embeddings response body, without building a Python float per value.
+        """
+
+        np = import_numpy()
+
+        position = 0
+        for match in _EMBEDDING_PATTERN.finditer(body):
+            # The index sits in the same data object as the vector.
+            start = body.rfind(b"{", 0, match.start())
+            end = body.find(b"}", match.end())
+            index_match = _INDEX_PATTERN.search(body, start, end)
+            if index_match is not None:
+                index = int(index_match.group(1))
+            else:
+                index = position
+
+            if match.group(1) is not None:
+                vector = np.fromstring(match.group(1), dtype=np.float32, sep=",")
+            else:
+                vector = np.frombuffer(base64.b64decode(match.group(2)), dtype="<f4")
+            yield index, vector
+            position += 1
+
+        if position == 0:
+            raise ValueError("Could not generate embeddings. No embeddings in response.")
+
+    def _generate_embeddings(
+        self,
+        model,
+        input,
+        truncate,
+        truncation_direction,
+        return_type="dict",
+        out=None,
+        encoding_format="float"
+    ):
         """
         Function to generate an embeddings response.
         """
 
-        headers = {
-            "Content-Type": "application/json",
-            "Authorization": "Bearer " + self.api_key,
-            "User-Agent": "Prediction Guard Python Client: " + __version__,
+        if type(input) is list and len(input) > 0 and type(input[0]) in (str, dict, list):
+            rows = len(input)
+        else:
+            rows = 1
+        self._check_return_type(return_type, out, rows)
+
+        payload_dict = self._base_payload(model, truncate, truncation_direction, encoding_format)
+        payload_dict["input"] = self._format_inputs(input)
+
+        payload = json.dumps(payload_dict)
+
+        if return_type == "numpy":
+            body = self._post_embeddings(payload, parse=False)
+            for index, vector in self._iter_vectors(body):
+                if out is None:
+                    out = import_numpy().empty((rows, len(vector)), dtype="float32")
+                out[index] = vector
+            return out
+
+        return self._post_embeddings(payload)
+
+    def _base_payload(self, model, truncate, truncation_direction, encoding_format):
+        """
+        Function to build the request fields shared by every batch of a call.
+        """
+
+        if encoding_format not in ("float", "base64"):
+            raise ValueError(
+                "Please enter either 'float' or 'base64' for the encoding_format value."
+            )
+
+        payload_dict = {
+            "model": model,
+            "truncate": truncate,
+            "truncation_direction": self._format_truncation_direction(truncation_direction)
         }
 
+        # Servers that do not support packed vectors ignore this field and
+        # answer with plain JSON numbers. Responses are decoded by the type
+        # of their vectors, and once a server is seen to ignore the field,
+        # plain floats are requested from it instead.
+        if encoding_format == "base64" and self._base64_supported is not False:
+            payload_dict["encoding_format"] = "base64"
+
+        return payload_dict
+
+    def _format_inputs(self, input):
+        """
+        Function to convert image inputs into base64 before they are sent.
+        """
+
         if type(input) is list and type(input[0]) is dict:
             inputs = []
             for item in input:
@@ -149,35 +1099,77 @@ class Embeddings:
         else:
             inputs = input
 
+        return inputs
+
+    def _format_truncation_direction(self, truncation_direction):
+        """
+        Function to convert the truncation direction into the form the API expects.
+        """
+
         if truncation_direction == "right":
-            truncation_direction = "Right"
+            return "Right"
         elif truncation_direction == "left":
-            truncation_direction = "Left"
+            return "Left"
         else:
             raise ValueError(
                 "Please enter either 'Right' or 'Left' for the truncation_direction value."
             )
 
-        payload_dict = {
-            "model": model,
-            "input": inputs,
-            "truncate": truncate,
-            "truncation_direction": truncation_direction
+    def _post_embeddings(self, payload, session=None, parse=True):
+        """
+        Function to send a serialized embeddings payload, returning either the
+        parsed response or the raw response body. Identical payloads already
+        in flight share one request.
+        """
+
+        if self.single_flight is not None:
+            return self.single_flight.do(
+                (self.url + "/embeddings", payload, parse),
+                lambda: self._send_embeddings(payload, session, parse)
+            )
+        return self._send_embeddings(payload, session, parse)
+
+    def _retry_embeddings(self, delay, payload, session, parse):
+        time.sleep(delay)
+        return self._post_embeddings(payload, session, parse)
+
+    def _send_embeddings(self, payload, session, parse):
+
+        headers = {
+            "Content-Type": "application/json",
+            "Authorization": "Bearer " + self.api_key,
+            "User-Agent": "Prediction Guard Python Client: " + __version__,
         }
 
-        payload = json.dumps(payload_dict)
-        response = requests.request(
+        response = (session or requests).request(
             "POST", self.url + "/embeddings", headers=headers, data=payload, timeout=self.timeout
         )
 
         # If the request was successful, print the proxies.
         if response.status_code == 200:
+            requested = '"encoding_format": "base64"' in payload
+            if not parse:
+                if requested:
+                    match = _EMBEDDING_PATTERN.search(response.content)
+                    if match is not None:
+                        self._base64_supported = match.group(2) is not None
+                return response.content
             ret = response.json()
+            for item in ret.get("data", []):
+                if type(item.get("embedding")) is str:
+                    item["embedding"] = self._decode_base64(item["embedding"])
+                    if requested:
+                        self._base64_supported = True
+                elif requested:
+                    self._base64_supported = False
             return ret
         elif response.status_code == 429:
-            raise ValueError(
+            retry_after = response.headers.get("Retry-After", "")
+            raise _RequestError(
                 "Could not connect to Prediction Guard API. "
-                "Too many requests, rate limit or quota exceeded."
+                "Too many requests, rate limit or quota exceeded.",
+                429,
+                float(retry_after) if retry_after.isdigit() else None
             )
         else:
             # Check if there is a json body in the response. Read that in,
@@ -187,7 +1179,17 @@ class Embeddings:
                 err = response.json()["error"]
             except Exception:
                 pass
-            raise ValueError("Could not generate embeddings. " + err)
+            raise _RequestError("Could not generate embeddings. " + err, response.status_code)
+
+    def _decode_base64(self, encoded):
+        """
+        Function to unpack a base64 little-endian float32 vector into a list of floats.
+        """
+
+        vector = array("f", base64.b64decode(encoded))
+        if sys.byteorder == "big":
+            vector.byteswap()
+        return vector.tolist()
 
     def list_models(self, capability: Optional[str] = "embedding") -> List[str]:
         # Get the list of current models.
@@ -1,8 +1,9 @@
 import json
 
 import requests
-from typing import Any, Dict
+from typing import Any, Dict, Optional
 
+from .cache import TieredCache, cached_checks
 from ..version import __version__
 
 
@@ -45,6 +46,31 @@ class Factuality:
         self.api_key = api_key
         self.url = url
         self.timeout = timeout
+        self._cache = None
+
+    def enable_cache(
+        self,
+        max_items: int = 10000,
+        ttl: Optional[float] = None,
+        path: Optional[str] = None
+    ) -> None:
+        """
+        Caches the result of every text, keyed by a hash of the text and the
+        reference text, so pairs that were checked before are not sent again.
+
+        :param max_items: Maximum number of results kept in memory.
+        :param ttl: Seconds a result stays valid, or None to keep results until evicted.
+        :param path: Path of a SQLite database shared between processes, or None for a memory only cache.
+        """
+
+        self._cache = TieredCache(max_items, ttl, path)
+
+    def disable_cache(self) -> None:
+        """
+        Sends every check again, discarding the cached results.
+        """
+
+        self._cache = None
 
     def check(self, reference: str, text: str) -> Dict[str, Any]:
         """
@@ -54,6 +80,14 @@ class Factuality:
         :param text: The text to check for factual consistency.
         """
 
+        if self._cache is not None:
+            return cached_checks(
+                self._cache,
+                ["/factuality", reference],
+                text,
+                lambda text: self._generate_score(reference, text)
+            )
+
         # Run _generate_score
         choices = self._generate_score(reference, text)
         return choices
@@ -0,0 +1,33 @@
+from typing import Any, Dict, List, Optional, Union
+
+
+def last_user_turn(
+    messages: Union[str, List[Dict[str, Any]]],
+    skip_non_text: bool = False
+) -> Optional[str]:
+    """
+    Returns the text of the last user turn of a conversation, or None when
+    there is no user turn or it holds no text.
+
+    :param messages: A string or an array of dictionaries containing a role and content.
+    :param skip_non_text: Whether a turn mixing text with other content, such as images, returns its text entries joined. Otherwise such a turn returns None.
+    :return: The text of the last user turn, or None.
+    """
+
+    if type(messages) is str:
+        return messages
+
+    for message in reversed(messages):
+        if message.get("role") != "user":
+            continue
+
+        content = message["content"]
+        if type(content) is str:
+            return content
+
+        texts = [entry["text"] for entry in content if entry.get("type") == "text"]
+        if not texts or (len(texts) < len(content) and not skip_non_text):
+            return None
+        return "\n".join(texts)
+
+    return None
@@ -1,6 +1,7 @@
 import requests
 from typing import Any, Dict, Optional
 
+from .single_flight import SingleFlight
 from ..version import __version__
 
 
@@ -39,6 +40,7 @@ class Models:
         self.api_key = api_key
         self.url = url
         self.timeout = timeout
+        self.single_flight = SingleFlight()
 
     def list(self, capability: Optional[str] = "") -> Dict[str, Any]:
         """
@@ -78,24 +80,30 @@ class Models:
             else:
                 models_path += "/" + capability
 
-        response = requests.request(
-            "GET", self.url + models_path, headers=headers, timeout=self.timeout
-        )
-
-        if response.status_code == 200:
-            ret = response.json()
-            return ret
-        elif response.status_code == 429:
-            raise ValueError(
-                "Could not connect to Prediction Guard API. "
-                "Too many requests, rate limit or quota exceeded."
+        def send():
+            response = requests.request(
+                "GET", self.url + models_path, headers=headers, timeout=self.timeout
             )
-        else:
-            # Check if there is a json body in the response. Read that in,
-            # print out the error field in the json body, and raise an exception.
-            err = ""
-            try:
-                err = response.json()["error"]
-            except Exception:
-                pass
-            raise ValueError("Could not check for injection. " + err)
+
+            if response.status_code == 200:
+                ret = response.json()
+                return ret
+            elif response.status_code == 429:
+                raise ValueError(
+                    "Could not connect to Prediction Guard API. "
+                    "Too many requests, rate limit or quota exceeded."
+                )
+            else:
+                # Check if there is a json body in the response. Read that in,
+                # print out the error field in the json body, and raise an exception.
+                err = ""
+                try:
+                    err = response.json()["error"]
+                except Exception:
+                    pass
+                raise ValueError("Could not check for injection. " + err)
+
+        # Identical requests already in flight share one response.
+        if self.single_flight is not None:
+            return self.single_flight.do(self.url + models_path, send)
+        return send()
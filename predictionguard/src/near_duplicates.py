@@ -0,0 +1,179 @@
+import random
+import zlib
+
+from typing import List, Sequence, Tuple
+
+from .optional import try_numpy
+
+
+# A prime just above 2**32; with 32 bit shingle hashes and coefficients
+# every (a * x + b) stays below 2**64, so the NumPy path never overflows.
+_PRIME = 4294967311
+
+
+class NearDuplicateDetector:
+    """
+    NearDuplicateDetector finds texts that are nearly identical, such as
+    boilerplate-heavy chunks of scraped web pages, with MinHash signatures
+    over character shingles and LSH banding. It runs entirely locally and is
+    meant as a pre-stage that collapses near-duplicates to one
+    representative before they are sent to /embeddings or /rerank, with the
+    representative's result fanned back out to every member of its group.
+
+    Usage::
+
+        from predictionguard import PredictionGuard
+        from predictionguard.src.near_duplicates import NearDuplicateDetector
+
+        client = PredictionGuard()
+        detector = NearDuplicateDetector(threshold=0.85)
+
+        response = client.embeddings.create_batch(
+            model="bge-m3",
+            input=chunks,
+            near_duplicates=detector
+        )
+
+        response = client.rerank.create(
+            model="bge-reranker-v2-m3",
+            query="What is Deep Learning?",
+            documents=candidates,
+            near_duplicates=detector
+        )
+    """
+
+    def __init__(
+        self,
+        threshold: float = 0.85,
+        num_perm: int = 128,
+        bands: int = 16,
+        shingle_size: int = 5,
+        seed: int = 0
+    ):
+        """
+        :param threshold: Estimated Jaccard similarity at which two texts count as duplicates.
+        :param num_perm: Number of MinHash permutations in a signature.
+        :param bands: Number of LSH bands the signature is split into. Must divide num_perm.
+        :param shingle_size: Number of characters per shingle.
+        :param seed: Seed of the hash permutations.
+        """
+
+        if not 0.0 < threshold <= 1.0:
+            raise ValueError("Please enter a threshold between 0 and 1.")
+        if bands < 1 or num_perm % bands != 0:
+            raise ValueError("Please enter a num_perm value divisible by bands.")
+        if shingle_size < 1:
+            raise ValueError("Please enter a shingle_size of at least 1.")
+
+        self.threshold = threshold
+        self.num_perm = num_perm
+        self.bands = bands
+        self.shingle_size = shingle_size
+
+        generator = random.Random(seed)
+        self._a = [generator.randrange(1, 2 ** 32) for _ in range(num_perm)]
+        self._b = [generator.randrange(0, 2 ** 32) for _ in range(num_perm)]
+
+        self._np = try_numpy()
+        if self._np is not None:
+            self._a_array = self._np.array(self._a, dtype=self._np.uint64)[:, None]
+            self._b_array = self._np.array(self._b, dtype=self._np.uint64)[:, None]
+
+    def signature(self, text: str) -> List[int]:
+        """
+        Returns the MinHash signature of a text.
+        """
+
+        text = " ".join(text.lower().split())
+        size = self.shingle_size
+        shingles = {
+            zlib.crc32(text[start:start + size].encode("utf-8"))
+            for start in range(max(len(text) - size + 1, 1))
+        }
+
+        np = self._np
+        if np is not None:
+            hashes = np.fromiter(shingles, dtype=np.uint64, count=len(shingles))
+            return ((self._a_array * hashes + self._b_array) % _PRIME).min(axis=1).tolist()
+
+        return [
+            min((a * shingle + b) % _PRIME for shingle in shingles)
+            for a, b in zip(self._a, self._b)
+        ]
+
+    def similarity(self, first: Sequence[int], second: Sequence[int]) -> float:
+        """
+        Returns the Jaccard similarity estimated from two signatures.
+        """
+
+        return sum(x == y for x, y in zip(first, second)) / self.num_perm
+
+    def group(self, texts: Sequence[str]) -> List[int]:
+        """
+        Groups near-duplicate texts. The first text of each group is its
+        representative, and texts are only matched against representatives
+        so that groups never chain through intermediate texts.
+
+        :param texts: The texts to group.
+        :return: For every text, the index of its representative text.
+        """
+
+        rows = self.num_perm // self.bands
+
+        exact = {}
+        signatures = {}
+        buckets = {}
+        groups = []
+        for index, text in enumerate(texts):
+            match = exact.get(text)
+            if match is not None:
+                groups.append(match)
+                continue
+
+            signature = self.signature(text)
+            keys = [
+                (band, tuple(signature[band * rows:(band + 1) * rows]))
+                for band in range(self.bands)
+            ]
+
+            checked = set()
+            for key in keys:
+                for candidate in buckets.get(key, ()):
+                    if candidate in checked:
+                        continue
+                    checked.add(candidate)
+                    if self.similarity(signature, signatures[candidate]) >= self.threshold:
+                        match = candidate
+                        break
+                if match is not None:
+                    break
+
+            if match is None:
+                match = index
+                signatures[index] = signature
+                for key in keys:
+                    buckets.setdefault(key, []).append(index)
+
+            exact[text] = match
+            groups.append(match)
+
+        return groups
+
+    def collapse(self, texts: Sequence[str]) -> Tuple[List[str], List[int]]:
+        """
+        Collapses near-duplicate texts to their representatives.
+
+        :param texts: The texts to collapse.
+        :return: A tuple of the representative texts and, for every input text, the position of its representative among them.
+        """
+
+        groups = self.group(texts)
+
+        positions = {}
+        unique = []
+        for index, representative in enumerate(groups):
+            if representative == index:
+                positions[index] = len(unique)
+                unique.append(texts[index])
+
+        return unique, [positions[representative] for representative in groups]
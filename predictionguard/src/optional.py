@@ -0,0 +1,43 @@
+def import_numpy():
+    """
+    Function to import NumPy for features that require it, raising an
+    ImportError naming the extra to install when it is missing.
+    """
+
+    try:
+        import numpy
+    except ImportError:
+        raise ImportError(
+            "NumPy is required for this feature. "
+            "Please install it with `pip install predictionguard[numpy]`."
+        )
+    return numpy
+
+
+def try_numpy():
+    """
+    Function to import NumPy for features with a pure Python fallback,
+    returning None when it is missing.
+    """
+
+    try:
+        import numpy
+    except ImportError:
+        return None
+    return numpy
+
+
+def import_pyarrow():
+    """
+    Function to import PyArrow for Arrow and Parquet output, raising an
+    ImportError naming the extra to install when it is missing.
+    """
+
+    try:
+        import pyarrow
+    except ImportError:
+        raise ImportError(
+            "PyArrow is required for Arrow and Parquet output. "
+            "Please install it with `pip install predictionguard[arrow]`."
+        )
+    return pyarrow
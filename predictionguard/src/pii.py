@@ -1,8 +1,12 @@
 import json
 
 import requests
-from typing import Any, Dict, List, Optional, Union
+from typing import Any, Callable, Dict, List, Optional, Union
 
+from .batching import MicroBatcher, split_checks
+from .cache import TieredCache, cached_checks
+from .columns import map_batches, map_column
+from .prescreen import PiiPreScreen
 from ..version import __version__
 
 
@@ -45,6 +49,90 @@ class Pii:
         self.api_key = api_key
         self.url = url
         self.timeout = timeout
+        self._batcher = None
+        self._cache = None
+        self._prescreen = None
+
+    def enable_batching(self, max_wait: float = 0.005, max_batch_size: int = 64) -> None:
+        """
+        Collects single prompt check calls made concurrently from different
+        threads into one list request to the /PII API, and hands every
+        caller its own result. Calls with a list of prompts are sent as is.
+
+        :param max_wait: Seconds a call waits for others to join its batch.
+        :param max_batch_size: Number of prompts at which a batch is sent without waiting further.
+        """
+
+        self._batcher = MicroBatcher(self._check_batch, max_wait, max_batch_size)
+
+    def disable_batching(self) -> None:
+        """
+        Sends every check call as its own request again.
+        """
+
+        self._batcher = None
+
+    def enable_cache(
+        self,
+        max_items: int = 10000,
+        ttl: Optional[float] = None,
+        path: Optional[str] = None
+    ) -> None:
+        """
+        Caches the result of every prompt, keyed by a hash of the prompt,
+        replace, replace_method and entity_list. Checks of a list of prompts
+        only send the prompts that have no cached result.
+
+        :param max_items: Maximum number of results kept in memory.
+        :param ttl: Seconds a result stays valid, or None to keep results until evicted.
+        :param path: Path of a SQLite database shared between processes, or None for a memory only cache.
+        """
+
+        self._cache = TieredCache(max_items, ttl, path)
+
+    def disable_cache(self) -> None:
+        """
+        Sends every check again, discarding the cached results.
+        """
+
+        self._cache = None
+
+    def enable_prescreen(
+        self,
+        pass_threshold: float = 0.15,
+        audit_rate: float = 0.01,
+        log_every: int = 1000
+    ) -> None:
+        """
+        Scans every prompt locally first with compiled patterns for email
+        addresses, phone, card and similar numbers, and hints of names and
+        addresses. Prompts with any finding or hint, and an audit_rate share
+        of the others, are sent to the /PII API; the rest are returned
+        unchanged with no PII found. See
+        predictionguard.src.prescreen.PreScreen.
+
+        :param pass_threshold: Local score below which a prompt is passed without a remote check.
+        :param audit_rate: Share of locally passed prompts that are checked remotely anyway.
+        :param log_every: Number of screened prompts between logged summaries, or 0 for none.
+        """
+
+        self._prescreen = PiiPreScreen(pass_threshold, audit_rate, log_every)
+
+    def disable_prescreen(self) -> None:
+        """
+        Sends every prompt to the API again.
+        """
+
+        self._prescreen = None
+
+    def prescreen_stats(self) -> Dict[str, Any]:
+        """
+        Returns the escalation and disagreement counts of the pre-screen.
+        """
+
+        if self._prescreen is None:
+            raise ValueError("Please enable the pre-screen to get its stats.")
+        return self._prescreen.stats()
 
     def check(
         self,
@@ -62,10 +150,85 @@ class Pii:
         :return: The PII checking response.
         """
 
+        def send(prompt):
+            if self._cache is not None:
+                return cached_checks(
+                    self._cache,
+                    ["/PII", replace, replace_method, entity_list],
+                    prompt,
+                    lambda prompt: self._send(prompt, replace, replace_method, entity_list)
+                )
+            return self._send(prompt, replace, replace_method, entity_list)
+
+        if self._prescreen is not None:
+            return self._prescreen.check(prompt, send, replace=replace)
+        return send(prompt)
+
+    def check_column(
+        self,
+        column: Any,
+        replace: bool,
+        replace_method: str = "random",
+        entity_list: Optional[list] = None,
+        batch_size: int = 64,
+        max_workers: int = 4,
+        chunk_size: int = 10000,
+        progress: Optional[Callable[[int, Optional[int]], None]] = None
+    ) -> Any:
+        """
+        Checks every value of a pandas/Polars Series for PII, sending
+        batch_size prompts per request with concurrent requests, and returns
+        an aligned Series of the new prompts when replacing, or of the check
+        results otherwise.
+
+        :param column: A pandas/Polars Series or list of prompts, or an iterator of them for data larger than memory.
+        :param replace: Whether to replace PII if it is present.
+        :param replace_method: Method to replace PII if it is present.
+        :param entity_list: List of entities for the PII check to ignore.
+        :param batch_size: Number of prompts sent in a single request.
+        :param max_workers: Maximum number of requests in flight at once.
+        :param chunk_size: Number of rows processed before progress is reported.
+        :param progress: Optional callable invoked with (rows done, total rows or None).
+        :return: A Series of the same kind as column, or an iterator of them.
+        """
+
+        def results(prompts):
+            checks = self.check(prompts, replace, replace_method, entity_list)["checks"]
+            checks = sorted(checks, key=lambda check: check.get("index", 0))
+            if replace:
+                return [check["new_prompt"] for check in checks]
+            return checks
+
+        def check(values):
+            return map_batches(values, results, batch_size, max_workers)
+
+        return map_column(column, check, chunk_size, progress, name="pii")
+
+    def _send(self, prompt, replace, replace_method, entity_list):
+        """
+        Function to send a check, through the batcher when batching is enabled.
+        """
+
+        if self._batcher is not None and type(prompt) is str:
+            key = (replace, replace_method, None if entity_list is None else tuple(entity_list))
+            return self._batcher.submit(key, prompt)
+
         # Run _check_pii
         choices = self._check_pii(prompt, replace, replace_method, entity_list)
         return choices
 
+    def _check_batch(self, key, prompts):
+        """
+        Function to check a batch of prompts and split the response per prompt.
+        """
+
+        replace, replace_method, entity_list = key
+        if entity_list is not None:
+            entity_list = list(entity_list)
+
+        response = self._check_pii(prompts, replace, replace_method, entity_list)
+        return split_checks(response, len(prompts))
+
     def _check_pii(self, prompt, replace, replace_method, entity_list):
         """Function to check for PII."""
 
@@ -0,0 +1,366 @@
+import re
+import json
+import time
+import random
+import logging
+import threading
+
+from abc import ABC, abstractmethod
+from typing import Any, Callable, Dict, List, Union
+
+from .batching import merge_checks, split_checks
+
+
+logger = logging.getLogger(__name__)
+
+
+class PreScreen(ABC):
+    """
+    PreScreen is a local first tier in front of a remote guardrail check.
+    Every prompt is scored by local detectors; prompts scoring below
+    pass_threshold are answered locally as clean, and every other prompt
+    is escalated to the API. The detectors are tuned to escalate on any
+    doubt, so only obviously clean text skips the remote call.
+
+    A random audit_rate share of the prompts passed locally is still sent
+    to the API, to measure how often the local tier passes a prompt the
+    remote check flags. Escalations, audits and disagreements are counted
+    in stats and logged to the predictionguard.src.prescreen logger.
+    Prompt text is never logged.
+
+    Subclasses implement score, flagged and local_check for one check.
+    PreScreen is not used directly; enable it on an endpoint instead.
+
+    Usage::
+
+        import logging
+
+        from predictionguard import PredictionGuard
+
+        logging.basicConfig(level=logging.INFO)
+
+        client = PredictionGuard()
+
+        client.injection.enable_prescreen(pass_threshold=0.15, audit_rate=0.01)
+        client.pii.enable_prescreen(audit_rate=0.01)
+
+        client.injection.check(prompt="What is the weather like today?", detect=True)
+
+        print(client.injection.prescreen_stats())
+    """
+
+    name = ""
+
+    def __init__(
+        self,
+        pass_threshold: float = 0.15,
+        audit_rate: float = 0.01,
+        log_every: int = 1000
+    ):
+        """
+        :param pass_threshold: Local score below which a prompt is passed without a remote check.
+        :param audit_rate: Share of locally passed prompts that are checked remotely anyway.
+        :param log_every: Number of screened prompts between logged summaries, or 0 for none.
+        """
+
+        if not 0 <= audit_rate <= 1:
+            raise ValueError("Please enter an audit_rate between 0 and 1.")
+
+        self.pass_threshold = pass_threshold
+        self.audit_rate = audit_rate
+        self.log_every = log_every
+
+        self._lock = threading.Lock()
+        self._counts = {
+            "screened": 0,
+            "passed": 0,
+            "escalated": 0,
+            "audited": 0,
+            "missed": 0,
+            "false_escalations": 0,
+        }
+
+    @abstractmethod
+    def score(self, text: str) -> float:
+        """
+        Returns the local score of text between 0 and 1, 0 meaning no signal.
+        """
+
+    @abstractmethod
+    def flagged(self, check: Dict[str, Any], text: str) -> bool:
+        """
+        Returns whether a remote check result flags text.
+        """
+
+    @abstractmethod
+    def local_check(self, text: str, **options: Any) -> Dict[str, Any]:
+        """
+        Returns the check result of a locally passed text, shaped like the
+        result of the API.
+        """
+
+    def check(
+        self,
+        prompt: Union[str, List[str]],
+        send: Callable[[Union[str, List[str]]], Dict[str, Any]],
+        **options: Any
+    ) -> Dict[str, Any]:
+        """
+        Screens one or a list of prompts, sending only the escalated and
+        audited prompts with send, and merges the results in prompt order.
+
+        :param prompt: The prompt or list of prompts to check.
+        :param send: Callable sending a prompt or list of prompts to the API.
+        :param options: Check options the local result depends on.
+        :return: A response in the format of the guardrail API.
+        """
+
+        prompts = [prompt] if type(prompt) is str else list(prompt)
+        results = [None] * len(prompts)
+
+        remote = []
+        for index, text in enumerate(prompts):
+            score = self.score(text)
+            passed = score < self.pass_threshold
+            audit = passed and self.audit_rate > 0 and random.random() < self.audit_rate
+
+            if passed and not audit:
+                results[index] = self._local_response(text, **options)
+            else:
+                remote.append((index, text, score, audit))
+
+        if remote:
+            texts = [text for _, text, _, _ in remote]
+            response = send(texts[0] if type(prompt) is str else texts)
+            for (index, text, score, audit), part in zip(remote, split_checks(response, len(texts))):
+                results[index] = part
+                self._record(score, audit, self.flagged(part["checks"][0], text))
+
+        with self._lock:
+            self._counts["screened"] += len(prompts)
+            self._counts["passed"] += len(prompts) - len(remote)
+            screened = self._counts["screened"]
+
+        if self.log_every and screened // self.log_every > (screened - len(prompts)) // self.log_every:
+            logger.info("%s pre-screen: %s", self.name, json.dumps(self.stats(), sort_keys=True))
+
+        return merge_checks(results)
+
+    def stats(self) -> Dict[str, Any]:
+        """
+        Returns the number of prompts screened, passed locally, escalated
+        and audited, the audited prompts the remote check flagged ("missed"),
+        the escalated prompts it did not flag ("false_escalations"), and the
+        escalation and miss rates.
+        """
+
+        with self._lock:
+            counts = dict(self._counts)
+
+        counts["escalation_rate"] = (
+            counts["escalated"] / counts["screened"] if counts["screened"] else 0.0
+        )
+        counts["miss_rate"] = counts["missed"] / counts["audited"] if counts["audited"] else 0.0
+        return counts
+
+    def _record(self, score, audit, flagged):
+        with self._lock:
+            if audit:
+                self._counts["audited"] += 1
+                self._counts["missed"] += flagged
+            else:
+                self._counts["escalated"] += 1
+                self._counts["false_escalations"] += not flagged
+
+        if audit and flagged:
+            logger.warning(
+                "%s pre-screen passed a prompt the remote check flagged (local score %.2f).",
+                self.name, score
+            )
+        elif not audit:
+            logger.debug(
+                "%s pre-screen escalated a prompt (local score %.2f, remote flagged: %s).",
+                self.name, score, flagged
+            )
+
+    def _local_response(self, text, **options):
+        return {
+            "id": "",
+            "object": self.name + "_check",
+            "created": int(time.time()),
+            "checks": [dict(self.local_check(text, **options), index=0, status="success")],
+        }
+
+
+_INJECTION_PATTERNS = [
+    (0.9, r"\b(?:ignore|disregard|forget|override|bypass|skip)\b.{0,40}?\b(?:previous|prior|above|earlier|preceding|all|any|your|the|these)\b.{0,20}?\b(?:instructions?|prompts?|rules?|directions?|guidelines?|context|messages?)\b"),
+    (0.9, r"\b(?:reveal|show|print|repeat|output|leak|tell me)\b.{0,30}?\b(?:system|hidden|initial|original|secret)\s+(?:prompt|instructions?|message|rules?)\b"),
+    (0.9, r"\b(?:ignore|disregard|forget|override|bypass|skip)\b.{0,30}?\b(?:above|before|everything|previous|prior|earlier|preceding)\b"),
+    (0.9, r"\b(?:jailbreak|jailbroken|do anything now)\b"),
+    # Jailbreak personas are matched case sensitively, so the name Dan is not.
+    (0.9, r"\b(?:you are|you're|youre|act as|you will be)\s+(?:now\s+)?(?:an?\s+)?(?-i:DAN|STAN|DUDE|AIM|AntiGPT|BetterDAN|Mongo Tom)\b"),
+    (0.5, r"\b(?-i:DAN|STAN|DUDE|AntiGPT|BetterDAN)\b|\bevil (?:confidant|assistant|ai)\b"),
+    (0.5, r"\b(?:you are|you're|youre) (?:now|no longer)\b"),
+    (0.5, r"\b(?:say|output|print|respond with|reply with|write)\s*:?\s*[\"'\u201c\u2018]"),
+    (0.5, r"\b(?:developer|god|admin|debug|unrestricted|unfiltered)\s+mode\b"),
+    (0.5, r"\b(?:pretend|act|behave|roleplay|role-play)\b.{0,20}?\b(?:as|like|to be)\b"),
+    (0.5, r"\bnew (?:instructions?|rules?|task|persona)\b"),
+    (0.5, r"\b(?:system prompt|from now on|no restrictions|without restrictions)\b"),
+    (0.2, r"(?:^|\n)\s*(?:system|assistant|user|human|ai)\s*:"),
+    (0.2, r"<\|[a-z_]+\|>|\[/?INST\]|###\s*(?:instruction|system|response)"),
+    (0.2, r"\b(?:instructions?|prompts?|rules?|guidelines?|policy|policies)\b"),
+    (0.2, "[\u200b-\u200f\u202a-\u202e\u2060-\u2064\ufeff]"),
+    (0.2, r"[A-Za-z0-9+/]{40,}={0,2}"),
+    # Only short single line prompts count as trivially clean.
+    (0.2, r"\n|.{200}"),
+]
+
+
+class InjectionPreScreen(PreScreen):
+    """
+    InjectionPreScreen scores prompts with weighted patterns for instruction
+    overrides, system prompt extraction, persona switches and jailbreak
+    personas, quoted output commands, chat template markers, invisible
+    characters and encoded payloads. The weights of all matching patterns
+    are combined into one score. Long or multi-line prompts always score
+    above the default pass_threshold, so only short prompts without any
+    signal pass locally.
+    """
+
+    name = "injection"
+
+    _patterns = [
+        (weight, re.compile(pattern, re.IGNORECASE | re.DOTALL))
+        for weight, pattern in _INJECTION_PATTERNS
+    ]
+
+    def __init__(
+        self,
+        pass_threshold: float = 0.15,
+        audit_rate: float = 0.01,
+        log_every: int = 1000,
+        flag_threshold: float = 0.5
+    ):
+        """
+        :param pass_threshold: Local score below which a prompt is passed without a remote check.
+        :param audit_rate: Share of locally passed prompts that are checked remotely anyway.
+        :param log_every: Number of screened prompts between logged summaries, or 0 for none.
+        :param flag_threshold: Remote injection probability counted as flagged in stats.
+        """
+
+        super().__init__(pass_threshold, audit_rate, log_every)
+        self.flag_threshold = flag_threshold
+
+    def score(self, text: str) -> float:
+        clean = 1.0
+        for weight, pattern in self._patterns:
+            if pattern.search(text):
+                clean *= 1.0 - weight
+        return 1.0 - clean
+
+    def flagged(self, check: Dict[str, Any], text: str) -> bool:
+        return check["probability"] >= self.flag_threshold
+
+    def local_check(self, text: str, **options: Any) -> Dict[str, Any]:
+        return {"probability": 0.0}
+
+
+_PII_PATTERNS = {
+    "EMAIL_ADDRESS": r"[A-Za-z0-9._%+-]+@[A-Za-z0-9.-]+\.[A-Za-z]{2,}",
+    "US_SSN": r"\b\d{3}-\d{2}-\d{4}\b",
+    "PHONE_NUMBER": r"(?:\+?\d{1,3}[\s.-]?)?\(?\b\d{3}\)?[\s.-]?\d{3}[\s.-]?\d{4}\b",
+    "IP_ADDRESS": r"\b(?:\d{1,3}\.){3}\d{1,3}\b",
+    "IBAN_CODE": r"\b[A-Z]{2}\d{2}[A-Z0-9]{11,30}\b",
+    # Written out addresses such as "john at gmail dot com".
+    "OBFUSCATED_EMAIL": r"(?i)\b[a-z0-9._%+-]+\s*(?:\s+at\s+|[(\[{<]\s*at\s*[)\]}>])\s*[a-z0-9-]+(?:\s*(?:\s+dot\s+|[(\[{<]\s*dot\s*[)\]}>]|\.)\s*[a-z0-9-]+)*?\s*(?:\s+dot\s+|[(\[{<]\s*dot\s*[)\]}>])\s*[a-z]{2,}\b",
+    "STREET_ADDRESS": r"(?i)\b\d{1,6}[a-z]?\s+(?:[a-z0-9.'-]+\s+){0,4}(?:st|street|ave|avenue|rd|road|blvd|boulevard|ln|lane|dr|drive|ct|court|pl|place|ter|terrace|cir|circle|pkwy|parkway|hwy|highway|sq|square)\b",
+}
+
+_CARD_PATTERN = re.compile(r"\b(?:\d[ -]?){12,18}\d\b")
+
+# Signals that are not PII by themselves but often come with it, such as
+# digit runs, digits near address words, "@" or "at" in a written address,
+# words that come with names, and personal keywords. They escalate rather
+# than flag.
+_PII_HINTS = re.compile(
+    r"\d{4,}|@|\bat\b.{1,40}?\bdot\b"
+    r"|\d.{0,30}?\b(?:st|street|ave|avenue|rd|road|blvd|lane|drive|apt|apartment|suite|unit|floor|box)\b"
+    r"|\b(?:address|street|avenue|apt|apartment|suite|lives?|located)\b.{0,30}?\d"
+    r"|\b(?:my name|i am|i'm|call me|named|name is|mr|mrs|ms|miss|lives?|address|street|avenue"
+    r"|born|birth|dob|age|passport|licen[cs]e|account|social security|phone|email|contact|zip"
+    r"|postal|patient|salary)\b",
+    re.IGNORECASE
+)
+
+_CAPITALIZED = re.compile(r"\b[A-Z][a-z]+")
+
+
+class PiiPreScreen(PreScreen):
+    """
+    PiiPreScreen scores prompts with compiled patterns for email addresses,
+    also written out ("john at gmail dot com"), street addresses, US social
+    security, phone, card (Luhn checked), IP and IBAN numbers, which score
+    1. Hints of PII such as digit runs, digits near address words, words
+    that come with names ("named", "lives", "Mr"), capitalized words within
+    a sentence and personal keywords score 0.5, so names and addresses the
+    patterns can not recognize are escalated too. A bare name with none of
+    these hints passes; audits measure how often such prompts pass.
+    """
+
+    name = "pii"
+
+    _patterns = {name: re.compile(pattern) for name, pattern in _PII_PATTERNS.items()}
+
+    def score(self, text: str) -> float:
+        if self.find(text):
+            return 1.0
+        if _PII_HINTS.search(text) or self._inner_capitalized(text):
+            return 0.5
+        return 0.0
+
+    def find(self, text: str) -> List[str]:
+        """
+        Returns the types of PII the local patterns find in text.
+        """
+
+        types = [name for name, pattern in self._patterns.items() if pattern.search(text)]
+
+        for match in _CARD_PATTERN.finditer(text):
+            if _luhn(re.sub(r"[ -]", "", match.group())):
+                types.append("CREDIT_CARD")
+                break
+
+        return types
+
+    def flagged(self, check: Dict[str, Any], text: str) -> bool:
+        if "new_prompt" in check:
+            return check["new_prompt"] != text
+
+        positions = check.get("pii_types_and_positions") or []
+        if type(positions) is str:
+            positions = json.loads(positions)
+        return len(positions) > 0
+
+    def local_check(self, text: str, replace: bool = False, **options: Any) -> Dict[str, Any]:
+        if replace:
+            return {"new_prompt": text}
+        return {"pii_types_and_positions": json.dumps([])}
+
+    def _inner_capitalized(self, text):
+        for match in _CAPITALIZED.finditer(text):
+            before = text[:match.start()].rstrip(" \t\"'(")
+            if before and before[-1] not in ".!?:\n":
+                return True
+        return False
+
+
+def _luhn(digits: str) -> bool:
+    total = 0
+    for position, digit in enumerate(reversed(digits)):
+        value = int(digit)
+        if position % 2 == 1:
+            value *= 2
+            if value > 9:
+                value -= 9
+        total += value
+    return total % 10 == 0
@@ -0,0 +1,115 @@
+from typing import Any, Tuple
+
+from .optional import import_numpy
+
+
+def quantize_int8(vectors: Any) -> Tuple[Any, Any]:
+    """
+    Quantizes float vectors to int8 with one scale per vector, so that
+    vectors[i] is approximately codes[i] * scales[i].
+
+    :param vectors: A (dim,) vector or an (n, dim) matrix.
+    :return: A tuple of int8 codes shaped like the input and float32 scales.
+    """
+
+    np = import_numpy()
+    vectors = np.asarray(vectors, dtype=np.float32)
+
+    scales = np.abs(vectors).max(axis=-1) / 127.0
+    # All-zero vectors keep a scale of one and quantize to zeros.
+    scales = np.where(scales > 0, scales, 1.0).astype(np.float32)
+
+    codes = np.rint(vectors / np.expand_dims(scales, -1))
+    codes = np.clip(codes, -127, 127).astype(np.int8)
+
+    return codes, scales
+
+
+def dequantize_int8(codes: Any, scales: Any) -> Any:
+    """
+    Reconstructs approximate float32 vectors from int8 codes and scales.
+
+    :param codes: int8 codes from quantize_int8.
+    :param scales: float32 scales from quantize_int8.
+    :return: float32 vectors shaped like codes.
+    """
+
+    np = import_numpy()
+    return codes.astype(np.float32) * np.expand_dims(scales, -1)
+
+
+def quantize_binary(vectors: Any) -> Any:
+    """
+    Quantizes float vectors to one bit per dimension (set when positive),
+    packed eight dimensions to a byte.
+
+    :param vectors: A (dim,) vector or an (n, dim) matrix.
+    :return: uint8 packed bits with a last axis of ceil(dim / 8).
+    """
+
+    np = import_numpy()
+    vectors = np.asarray(vectors, dtype=np.float32)
+
+    return np.packbits(vectors > 0, axis=-1)
+
+
+def int8_similarity(
+    query_codes: Any,
+    query_scales: Any,
+    codes: Any,
+    scales: Any
+) -> Any:
+    """
+    Computes dot product similarities between int8 quantized queries and
+    vectors without dequantizing them. For normalized embeddings this
+    approximates cosine similarity.
+
+    :param query_codes: (m, dim) or (dim,) int8 codes of the queries.
+    :param query_scales: (m,) or scalar scales of the queries.
+    :param codes: (n, dim) int8 codes of the vectors to compare against.
+    :param scales: (n,) scales of the vectors to compare against.
+    :return: An (m, n) float32 similarity matrix, or (n,) for a single query.
+    """
+
+    np = import_numpy()
+
+    # Accumulate in int32 so 127 * 127 * dim cannot overflow.
+    dots = np.asarray(query_codes, dtype=np.int32) @ np.asarray(codes, dtype=np.int32).T
+    similarity = dots.astype(np.float32) * np.expand_dims(query_scales, -1) * scales
+
+    return similarity.astype(np.float32)
+
+
+_POPCOUNT = None
+
+
+def hamming_similarity(query_bits: Any, bits: Any, dim: int) -> Any:
+    """
+    Computes similarities between binary quantized queries and vectors as
+    the fraction of matching bits.
+
+    :param query_bits: (m, bytes) or (bytes,) packed bits of the queries.
+    :param bits: (n, bytes) packed bits of the vectors to compare against.
+    :param dim: Number of dimensions in the original vectors.
+    :return: An (m, n) float32 similarity matrix, or (n,) for a single query.
+    """
+
+    global _POPCOUNT
+
+    np = import_numpy()
+
+    if _POPCOUNT is None:
+        _POPCOUNT = np.unpackbits(np.arange(256, dtype=np.uint8)[:, None], axis=1).sum(axis=1)
+
+    query_bits = np.asarray(query_bits, dtype=np.uint8)
+    single = query_bits.ndim == 1
+    query_bits = np.atleast_2d(query_bits)
+    bits = np.asarray(bits, dtype=np.uint8)
+
+    distances = np.empty((query_bits.shape[0], bits.shape[0]), dtype=np.int32)
+    for i, query in enumerate(query_bits):
+        distances[i] = _POPCOUNT[np.bitwise_xor(bits, query)].sum(axis=1)
+
+    similarity = (1.0 - distances / float(dim)).astype(np.float32)
+
+    return similarity[0] if single else similarity
@@ -1,8 +1,16 @@
 import json
+import time
+import heapq
+import hashlib
 
 import requests
-from typing import Any, Dict, List, Optional
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from typing import Any, Callable, Dict, List, Optional
 
+from .cache import LRUCache
+from .columns import map_batches, map_column
+from .near_duplicates import NearDuplicateDetector
+from .single_flight import SingleFlight
 from ..version import __version__
 
 
@@ -50,13 +58,16 @@ class Rerank:
         self.api_key = api_key
         self.url = url
         self.timeout = timeout
+        self.single_flight = SingleFlight()
 
     def create(
             self,
             model: str,
             query: str,
             documents: List[str],
-            return_documents: Optional[bool] = True
+            return_documents: Optional[bool] = True,
+            cache: Optional[LRUCache] = None,
+            near_duplicates: Optional[NearDuplicateDetector] = None
     ) -> Dict[str, Any]:
         """
         Creates a rerank request in the Prediction Guard /rerank API.
@@ -65,13 +76,222 @@ class Rerank:
         :param query: The query to rank against.
         :param documents: The documents to rank.
         :param return_documents: Whether to return documents with score.
+        :param cache: Optional LRUCache of relevance scores per model, query and document. Only uncached documents are sent to the API.
+        :param near_duplicates: Optional NearDuplicateDetector; near-duplicate documents are ranked once and share the score.
         :return: A dictionary containing the tokens and token metadata.
         """
 
+        if near_duplicates is not None:
+            return self._create_rerank_collapsed(
+                model, query, documents, return_documents, cache, near_duplicates
+            )
+
+        if cache is not None:
+            return self._create_rerank_cached(model, query, documents, return_documents, cache)
+
         # Run _create_rerank
         choices = self._create_rerank(model, query, documents, return_documents)
         return choices
 
+    def create_sharded(
+            self,
+            model: str,
+            query: str,
+            documents: List[str],
+            return_documents: Optional[bool] = True,
+            shard_size: int = 100,
+            max_workers: int = 4,
+            top_n: Optional[int] = None,
+            stop_score: Optional[float] = None
+    ) -> Dict[str, Any]:
+        """
+        Reranks a large list of documents by splitting it into shards that are
+        sent to the /rerank API concurrently, then merging the shard results
+        into one globally ordered result with a top-n heap. Result indices
+        refer to positions in the original documents list.
+
+        :param model: The model to use for reranking.
+        :param query: The query to rank against.
+        :param documents: The documents to rank.
+        :param return_documents: Whether to return documents with score.
+        :param shard_size: Maximum number of documents sent in a single request.
+        :param max_workers: Maximum number of requests in flight at once.
+        :param top_n: Number of results to keep. All results are kept when not given.
+        :param stop_score: With top_n, stop sending shards once the top_n results all score at least this much. This is an approximate early stop: the unsent shards are never scored, so a better document in a later shard can be missed. Leave it unset for the exact top_n results.
+        :return: A dictionary in the /rerank response format.
+        """
+
+        if shard_size < 1:
+            raise ValueError("Please enter a shard_size of at least 1.")
+        if max_workers < 1:
+            raise ValueError("Please enter a max_workers value of at least 1.")
+        if stop_score is not None and top_n is None:
+            raise ValueError("Please enter a top_n value when using stop_score.")
+
+        offsets = iter(range(0, len(documents), shard_size))
+        heap = []
+        ret = None
+
+        executor = ThreadPoolExecutor(max_workers=max_workers)
+        try:
+            pending = {}
+            while True:
+                # Shards are submitted as workers free up, so an early stop
+                # leaves the remaining shards unsent.
+                for offset in offsets:
+                    future = executor.submit(
+                        self._create_rerank,
+                        model,
+                        query,
+                        documents[offset:offset + shard_size],
+                        return_documents
+                    )
+                    pending[future] = offset
+                    if len(pending) >= max_workers:
+                        break
+
+                if not pending:
+                    break
+
+                done, _ = wait(pending, return_when=FIRST_COMPLETED)
+                for future in done:
+                    offset = pending.pop(future)
+                    response = future.result()
+                    if ret is None:
+                        ret = {key: value for key, value in response.items() if key != "results"}
+
+                    for result in response["results"]:
+                        result["index"] += offset
+                        entry = (result["relevance_score"], -result["index"], result)
+                        if top_n is None or len(heap) < top_n:
+                            heapq.heappush(heap, entry)
+                        elif entry[:2] > heap[0][:2]:
+                            heapq.heapreplace(heap, entry)
+
+                if (
+                    stop_score is not None
+                    and len(heap) >= top_n
+                    and heap[0][0] >= stop_score
+                ):
+                    break
+        finally:
+            executor.shutdown(wait=False, cancel_futures=True)
+
+        if ret is None:
+            ret = {"object": "list", "model": model}
+        ret["results"] = [entry[2] for entry in sorted(heap, key=lambda entry: entry[:2], reverse=True)]
+        return ret
+
+    def score_column(
+        self,
+        model: str,
+        query: str,
+        column: Any,
+        batch_size: int = 64,
+        max_workers: int = 4,
+        chunk_size: int = 10000,
+        progress: Optional[Callable[[int, Optional[int]], None]] = None
+    ) -> Any:
+        """
+        Scores every document of a pandas/Polars Series against a query,
+        sending batch_size documents per request with concurrent requests,
+        and returns an aligned Series of relevance scores.
+
+        :param model: The model to use for reranking.
+        :param query: The query to rank against.
+        :param column: A pandas/Polars Series or list of documents, or an iterator of them for data larger than memory.
+        :param batch_size: Number of documents sent in a single request.
+        :param max_workers: Maximum number of requests in flight at once.
+        :param chunk_size: Number of rows processed before progress is reported.
+        :param progress: Optional callable invoked with (rows done, total rows or None).
+        :return: A Series of relevance scores of the same kind as column, or an iterator of them.
+        """
+
+        def scores(documents):
+            results = self._create_rerank(model, query, documents, False)["results"]
+            ordered = [None] * len(documents)
+            for result in results:
+                ordered[result["index"]] = result["relevance_score"]
+            return ordered
+
+        def score(values):
+            return map_batches(values, scores, batch_size, max_workers)
+
+        return map_column(column, score, chunk_size, progress, name="relevance_score")
+
+    def _create_rerank_collapsed(self, model, query, documents, return_documents, cache, detector):
+        """
+        Function to rank only one representative of each group of
+        near-duplicate documents and fan its score out to the group.
+        """
+
+        unique, positions = detector.collapse(documents)
+        ret = self.create(model, query, unique, False, cache)
+
+        scores = [None] * len(unique)
+        for result in ret.pop("results"):
+            scores[result["index"]] = result["relevance_score"]
+
+        results = []
+        for index, position in enumerate(positions):
+            result = {"index": index, "relevance_score": scores[position]}
+            if return_documents:
+                result["text"] = documents[index]
+            results.append(result)
+        results.sort(key=lambda result: -result["relevance_score"])
+
+        ret["results"] = results
+        return ret
+
+    def _create_rerank_cached(self, model, query, documents, return_documents, cache):
+        """
+        Function to rank text, sending only documents without a cached score.
+        """
+
+        keys = _score_keys(model, query, documents)
+        scores = cache.get_many(keys)
+
+        missing = {}
+        for key, document, score in zip(keys, documents, scores):
+            if score is None and key not in missing:
+                missing[key] = document
+
+        if len(missing) == len(documents):
+            ret = self._create_rerank(model, query, documents, return_documents)
+            for result in ret["results"]:
+                cache.set(keys[result["index"]], result["relevance_score"])
+            return ret
+
+        if missing:
+            missing_keys = list(missing)
+            ret = self._create_rerank(model, query, list(missing.values()), False)
+
+            fetched = {}
+            for result in ret["results"]:
+                key = missing_keys[result["index"]]
+                fetched[key] = result["relevance_score"]
+                cache.set(key, result["relevance_score"])
+
+            scores = [
+                score if score is not None else fetched[key]
+                for key, score in zip(keys, scores)
+            ]
+            ret = {key: value for key, value in ret.items() if key != "results"}
+        else:
+            ret = {"object": "list", "created": int(time.time()), "model": model}
+
+        results = []
+        for index, score in enumerate(scores):
+            result = {"index": index, "relevance_score": score}
+            if return_documents:
+                result["text"] = documents[index]
+            results.append(result)
+        # Same ordering as the API: most relevant first.
+        results.sort(key=lambda result: -result["relevance_score"])
+
+        ret["results"] = results
+        return ret
+
     def _create_rerank(self, model, query, documents, return_documents):
         """
         Function to rank text.
@@ -92,27 +312,33 @@ class Rerank:
 
         payload = json.dumps(payload)
 
-        response = requests.request(
-            "POST", self.url + "/rerank", headers=headers, data=payload, timeout=self.timeout
-        )
-
-        if response.status_code == 200:
-            ret = response.json()
-            return ret
-        elif response.status_code == 429:
-            raise ValueError(
-                "Could not connect to Prediction Guard API. "
-                "Too many requests, rate limit or quota exceeded."
+        def send():
+            response = requests.request(
+                "POST", self.url + "/rerank", headers=headers, data=payload, timeout=self.timeout
             )
-        else:
-            # Check if there is a json body in the response. Read that in,
-            # print out the error field in the json body, and raise an exception.
-            err = ""
-            try:
-                err = response.json()["error"]
-            except Exception:
-                pass
-            raise ValueError("Could not rank documents. " + err)
+
+            if response.status_code == 200:
+                ret = response.json()
+                return ret
+            elif response.status_code == 429:
+                raise ValueError(
+                    "Could not connect to Prediction Guard API. "
+                    "Too many requests, rate limit or quota exceeded."
+                )
+            else:
+                # Check if there is a json body in the response. Read that in,
+                # print out the error field in the json body, and raise an exception.
+                err = ""
+                try:
+                    err = response.json()["error"]
+                except Exception:
+                    pass
+                raise ValueError("Could not rank documents. " + err)
+
+        # Identical requests already in flight share one response.
+        if self.single_flight is not None:
+            return self.single_flight.do((self.url + "/rerank", payload), send)
+        return send()
 
     def list_models(self):
         # Get the list of current models.
@@ -129,3 +355,18 @@ class Rerank:
             response_list.append(model["id"])
 
         return response_list
+
+
+def _score_keys(model, query, documents):
+    """
+    Function to build the rerank cache key of every document.
+    """
+
+    scope = hashlib.sha256(json.dumps([model, query]).encode("utf-8")).hexdigest()
+
+    return [
+        hashlib.sha256(
+            (scope + hashlib.sha256(document.encode("utf-8")).hexdigest()).encode("utf-8")
+        ).hexdigest()
+        for document in documents
+    ]
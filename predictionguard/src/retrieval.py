@@ -0,0 +1,159 @@
+import time
+
+from typing import Any, Callable, Dict, Mapping, Optional, Sequence, Union
+
+from .cache import EmbeddingsCache, LRUCache
+from .vector_index import VectorIndex
+
+
+class RetrievalPipeline:
+    """
+    RetrievalPipeline is a two-stage retriever. It embeds a query with
+    Embeddings, takes the top k candidates from a local VectorIndex, sends
+    only those to Rerank without echoing their text back, and maps the
+    reranked results to document ids. Query embeddings are cached and every
+    call reports how long each stage took.
+
+    Usage::
+
+        from predictionguard import PredictionGuard
+        from predictionguard.src.retrieval import RetrievalPipeline
+
+        client = PredictionGuard()
+
+        pipeline = RetrievalPipeline(
+            client.embeddings,
+            client.rerank,
+            embedding_model="bge-m3",
+            rerank_model="bge-reranker-v2-m3",
+            k=100,
+            n=10
+        )
+        pipeline.add_documents(
+            ["doc-1", "doc-2"],
+            ["Deep Learning is pizza.", "Deep Learning is not pizza."]
+        )
+
+        response = pipeline.query("What is Deep Learning?")
+        print(response["results"], response["timings"])
+    """
+
+    def __init__(
+        self,
+        embeddings: Any,
+        rerank: Any,
+        embedding_model: str,
+        rerank_model: str,
+        index: Optional[VectorIndex] = None,
+        documents: Optional[Union[Mapping[Any, str], Callable[[Any], str]]] = None,
+        k: int = 100,
+        n: int = 10,
+        query_cache_size: int = 1024,
+        cache: Optional[EmbeddingsCache] = None
+    ):
+        """
+        :param embeddings: The client Embeddings object, e.g. client.embeddings.
+        :param rerank: The client Rerank object, e.g. client.rerank.
+        :param embedding_model: Model to use for embeddings.
+        :param rerank_model: Model to use for reranking.
+        :param index: VectorIndex to search. A new empty index is used when not given.
+        :param documents: Mapping or callable from id to document text. Texts passed to add_documents are kept when not given.
+        :param k: Number of vector search candidates sent to rerank.
+        :param n: Number of reranked results returned.
+        :param query_cache_size: Number of query embeddings kept in memory.
+        :param cache: Optional EmbeddingsCache used when embedding documents.
+        """
+
+        self.embeddings = embeddings
+        self.rerank = rerank
+        self.embedding_model = embedding_model
+        self.rerank_model = rerank_model
+        self.index = index if index is not None else VectorIndex()
+        self.documents = documents if documents is not None else {}
+        self.k = k
+        self.n = n
+        self.cache = cache
+
+        self._query_cache = LRUCache(max_items=query_cache_size)
+
+    def add_documents(self, ids: Sequence[Any], texts: Sequence[str], **kwargs: Any) -> None:
+        """
+        Embeds documents and adds them to the index.
+
+        :param ids: Ids of the documents.
+        :param texts: Texts of the documents.
+        :param kwargs: Further options passed on to Embeddings.create_batch.
+        """
+
+        self.index.add_texts(
+            self.embeddings, self.embedding_model, texts, ids=ids, cache=self.cache, **kwargs
+        )
+        if isinstance(self.documents, dict):
+            self.documents.update(zip(ids, texts))
+
+    def delete_documents(self, ids: Sequence[Any]) -> None:
+        self.index.delete(ids)
+        if isinstance(self.documents, dict):
+            for id in ids:
+                self.documents.pop(id, None)
+
+    def query(self, query: str, k: Optional[int] = None, n: Optional[int] = None) -> Dict[str, Any]:
+        """
+        Retrieves the n most relevant documents for a query.
+
+        :param query: The query text.
+        :param k: Number of vector search candidates sent to rerank. Defaults to the pipeline k.
+        :param n: Number of reranked results returned. Defaults to the pipeline n.
+        :return: A dictionary with "results", each holding an id, relevance_score and
+            vector_score, "timings" in seconds per stage, and whether the query
+            embedding came from the cache.
+        """
+
+        k = k or self.k
+        n = n or self.n
+
+        start = time.perf_counter()
+
+        vector = self._query_cache.get(query)
+        cache_hit = vector is not None
+        if not cache_hit:
+            vector = self.embeddings.create_batch(
+                self.embedding_model, [query], return_type="numpy"
+            )[0]
+            self._query_cache.set(query, vector)
+        embedded = time.perf_counter()
+
+        ids, scores = self.index.search(vector, k=k)
+        searched = time.perf_counter()
+
+        results = []
+        if ids:
+            response = self.rerank.create(
+                model=self.rerank_model,
+                query=query,
+                documents=[self._document(id) for id in ids],
+                return_documents=False
+            )
+            for result in response["results"][:n]:
+                results.append({
+                    "id": ids[result["index"]],
+                    "relevance_score": result["relevance_score"],
+                    "vector_score": float(scores[result["index"]])
+                })
+        reranked = time.perf_counter()
+
+        return {
+            "results": results,
+            "query_cache_hit": cache_hit,
+            "timings": {
+                "embed": embedded - start,
+                "search": searched - embedded,
+                "rerank": reranked - searched,
+                "total": reranked - start
+            }
+        }
+
+    def _document(self, id):
+        if callable(self.documents):
+            return self.documents(id)
+        return self.documents[id]
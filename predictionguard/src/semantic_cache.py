@@ -0,0 +1,229 @@
+import copy
+import json
+import hashlib
+import threading
+import time
+
+from collections import OrderedDict
+from typing import Any, Dict, List, Optional, Tuple, Union
+
+from .messages import last_user_turn
+from .vector_index import VectorIndex
+
+
+class SemanticCache:
+    """
+    SemanticCache sits in front of chat completions and answers paraphrases
+    of questions it has seen before. The last user turn of a conversation
+    is embedded and looked up in a local VectorIndex; when a stored turn is
+    at least threshold similar, its cached response is returned instead of
+    generating a new one. Entries are scoped by model, system prompt and
+    tools, so a cached answer is only reused under the same setup. Hit rate
+    and the generation time saved by hits are reported by metrics.
+
+    Only the last user turn is compared, so earlier turns of a conversation
+    do not affect a lookup.
+
+    Usage::
+
+        from predictionguard import PredictionGuard
+        from predictionguard.src.semantic_cache import SemanticCache
+
+        client = PredictionGuard()
+
+        cache = SemanticCache(
+            client.embeddings,
+            client.chat.completions,
+            embedding_model="bge-m3",
+            threshold=0.92
+        )
+
+        result = cache.create(
+            model="Hermes-3-Llama-3.1-8B",
+            messages=[
+                {"role": "system", "content": "You are a support assistant."},
+                {"role": "user", "content": "How do I reset my password?"}
+            ]
+        )
+
+        print(cache.metrics())
+    """
+
+    def __init__(
+        self,
+        embeddings: Any,
+        chat: Any,
+        embedding_model: str,
+        threshold: float = 0.92,
+        max_items: int = 10000,
+        ttl: Optional[float] = None
+    ):
+        """
+        :param embeddings: The client Embeddings object, e.g. client.embeddings.
+        :param chat: The client ChatCompletions object, e.g. client.chat.completions.
+        :param embedding_model: Model to use for embeddings.
+        :param threshold: Cosine similarity at which a stored turn counts as a hit.
+        :param max_items: Maximum number of responses kept before the least recently used is evicted.
+        :param ttl: Seconds a response stays valid, or None to keep responses until evicted.
+        """
+
+        if max_items < 1:
+            raise ValueError("Please enter a max_items value of at least 1.")
+
+        self.embeddings = embeddings
+        self.chat = chat
+        self.embedding_model = embedding_model
+        self.threshold = threshold
+        self.max_items = max_items
+        self.ttl = ttl
+
+        self._indexes = {}
+        self._entries = OrderedDict()
+        self._next_id = 0
+        self._lock = threading.Lock()
+
+        self._lookups = 0
+        self._hits = 0
+        self._saved_seconds = 0.0
+        self._lookup_seconds = 0.0
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def create(
+        self,
+        model: str,
+        messages: Union[str, List[Dict[str, Any]]],
+        **kwargs: Any
+    ) -> Dict[str, Any]:
+        """
+        Returns a cached response for a similar last user turn, or creates a
+        chat completion and caches it. Conversations whose last user turn
+        holds more than text are passed through uncached.
+
+        :param model: The ID of the model to use.
+        :param messages: The content of the call, a string or an array of dictionaries containing a role and content.
+        :param kwargs: Further options passed on to ChatCompletions.create.
+        :return: A dictionary containing the chat response.
+        """
+
+        if kwargs.get("stream"):
+            raise ValueError("Streaming is not supported by the semantic cache.")
+        if kwargs.get("raw"):
+            raise ValueError("The semantic cache can not be used with raw responses.")
+
+        # A turn with images is not cached, since only its text is compared.
+        turn = last_user_turn(messages)
+        if turn is None:
+            return self.chat.create(model=model, messages=messages, **kwargs)
+
+        start = time.perf_counter()
+
+        scope = self._scope(model, messages, kwargs.get("tools"), kwargs.get("tool_choice"))
+        vector = self.embeddings.create_batch(
+            self.embedding_model, [turn], return_type="numpy"
+        )[0]
+        hit = self._lookup(scope, vector)
+
+        looked_up = time.perf_counter()
+
+        with self._lock:
+            self._lookups += 1
+            self._lookup_seconds += looked_up - start
+            if hit is not None:
+                self._hits += 1
+                self._saved_seconds += hit[1]
+
+        if hit is not None:
+            return copy.deepcopy(hit[0])
+
+        response = self.chat.create(model=model, messages=messages, **kwargs)
+        self._store(scope, vector, copy.deepcopy(response), time.perf_counter() - looked_up)
+
+        return response
+
+    def metrics(self) -> Dict[str, Any]:
+        """
+        Returns the number of lookups and hits, the hit rate, the generation
+        time in seconds saved by hits, and the seconds spent on lookups.
+        """
+
+        with self._lock:
+            return {
+                "lookups": self._lookups,
+                "hits": self._hits,
+                "hit_rate": self._hits / self._lookups if self._lookups else 0.0,
+                "saved_seconds": self._saved_seconds,
+                "lookup_seconds": self._lookup_seconds,
+            }
+
+    def clear(self) -> None:
+        """
+        Removes every cached response. Metrics are kept.
+        """
+
+        with self._lock:
+            self._indexes.clear()
+            self._entries.clear()
+
+    def _lookup(self, scope, vector) -> Optional[Tuple[Dict[str, Any], float]]:
+        """
+        Function to find the cached response and generation time of the most
+        similar stored turn in a scope.
+        """
+
+        with self._lock:
+            index = self._indexes.get(scope)
+            if index is None:
+                return None
+
+            ids, scores = index.search(vector, k=1)
+            if not ids or scores[0] < self.threshold:
+                return None
+
+            response, latency, expires = self._entries[ids[0]]
+            if expires is not None and expires <= time.monotonic():
+                self._evict(ids[0])
+                return None
+
+            self._entries.move_to_end(ids[0])
+            return response, latency
+
+    def _store(self, scope, vector, response, latency):
+        expires = time.monotonic() + self.ttl if self.ttl is not None else None
+
+        with self._lock:
+            index = self._indexes.get(scope)
+            if index is None:
+                index = self._indexes[scope] = VectorIndex(metric="cosine")
+
+            id = self._next_id
+            self._next_id += 1
+            index.add([(scope, id)], vector)
+            self._entries[(scope, id)] = (response, latency, expires)
+
+            while len(self._entries) > self.max_items:
+                self._evict(next(iter(self._entries)))
+
+    def _evict(self, key):
+        scope = key[0]
+        del self._entries[key]
+        index = self._indexes[scope]
+        index.delete([key])
+        if len(index) == 0:
+            del self._indexes[scope]
+
+    def _scope(self, model, messages, tools, tool_choice) -> str:
+        """
+        Function to hash the setup a cached response is valid under.
+        """
+
+        system = []
+        if type(messages) is list:
+            system = [
+                message["content"] for message in messages
+                if message.get("role") in ("system", "developer")
+            ]
+
+        scope = json.dumps([model, system, tools, tool_choice], sort_keys=True)
+        return hashlib.sha256(scope.encode("utf-8")).hexdigest()
@@ -0,0 +1,156 @@
+import os
+import sys
+
+from multiprocessing import resource_tracker, shared_memory
+from typing import Any, Optional, Tuple
+
+from .optional import import_numpy
+
+
+# Before Python 3.13 every block a process creates or attaches to is
+# registered with the resource tracker, which unlinks it when the process
+# exits, and the track option to turn that off does not exist yet.
+_TRACKED = sys.version_info < (3, 13) and os.name == "posix"
+
+
+def _open(**kwargs):
+    # Lifetime is managed explicitly through unlink, so the resource tracker
+    # must not free the block when the producing worker process exits.
+    if sys.version_info >= (3, 13):
+        return shared_memory.SharedMemory(track=False, **kwargs)
+
+    shm = shared_memory.SharedMemory(**kwargs)
+    if _TRACKED:
+        resource_tracker.unregister(shm._name, "shared_memory")
+    return shm
+
+
+def _unlink(shm):
+    if _TRACKED:
+        # unlink unregisters the block, so it is registered again first.
+        resource_tracker.register(shm._name, "shared_memory")
+    shm.unlink()
+
+
+class SharedEmbeddings:
+    """
+    SharedEmbeddings is a small picklable handle to a float32 embeddings
+    matrix held in a multiprocessing.shared_memory block, or in a
+    memory-mapped file when a path is given. Only the handle crosses process
+    boundaries; the consumer attaches to the same memory without copying.
+
+    The process that consumes the result is responsible for calling unlink
+    once it is done with a shared memory block.
+
+    Usage::
+
+        from multiprocessing import Pool
+
+        from predictionguard import PredictionGuard
+
+        def embed(chunks):
+            client = PredictionGuard()
+            return client.embeddings.create_batch(
+                model="bge-m3", input=chunks, return_type="shared_memory"
+            )
+
+        with Pool(4) as pool:
+            for handle in pool.imap(embed, corpus_chunks):
+                vectors = handle.attach()
+                index.add(vectors)
+                handle.unlink()
+    """
+
+    def __init__(
+        self,
+        name: Optional[str],
+        shape: Tuple[int, int],
+        dtype: str = "float32",
+        path: Optional[str] = None
+    ):
+        """
+        :param name: Name of the shared memory block, or None for a memory-mapped file.
+        :param shape: Shape of the matrix.
+        :param dtype: NumPy dtype of the matrix.
+        :param path: Path of the memory-mapped file, or None for a shared memory block.
+        """
+
+        self.name = name
+        self.shape = tuple(shape)
+        self.dtype = dtype
+        self.path = path
+        self._shm = None
+
+    @classmethod
+    def create(
+        cls,
+        shape: Tuple[int, int],
+        dtype: str = "float32",
+        path: Optional[str] = None
+    ) -> "SharedEmbeddings":
+        """
+        Allocates a new shared memory block, or memory-mapped file when path is given.
+        """
+
+        np = import_numpy()
+
+        if path is not None:
+            # Create the file at its full size; attach maps it afterwards.
+            mapped = np.memmap(path, dtype=dtype, mode="w+", shape=tuple(shape))
+            del mapped
+            return cls(None, shape, dtype, path)
+
+        size = max(int(np.prod(shape)) * np.dtype(dtype).itemsize, 1)
+        shm = _open(create=True, size=size)
+
+        handle = cls(shm.name, shape, dtype)
+        handle._shm = shm
+        return handle
+
+    def attach(self) -> Any:
+        """
+        Returns a NumPy array backed by the shared memory, without copying.
+        """
+
+        np = import_numpy()
+
+        if self.path is not None:
+            return np.memmap(self.path, dtype=self.dtype, mode="r+", shape=self.shape)
+
+        if self._shm is None:
+            self._shm = _open(name=self.name)
+        return np.ndarray(self.shape, dtype=self.dtype, buffer=self._shm.buf)
+
+    def close(self) -> None:
+        """
+        Detaches this process from the shared memory block. Arrays returned
+        by attach must be released first.
+        """
+
+        if self._shm is not None:
+            self._shm.close()
+            self._shm = None
+
+    def unlink(self) -> None:
+        """
+        Frees the shared memory block once every process is done with it.
+        """
+
+        if self.path is not None:
+            return
+
+        if self._shm is None:
+            self._shm = _open(name=self.name)
+        self._shm.close()
+        _unlink(self._shm)
+        self._shm = None
+
+    def __getstate__(self):
+        state = self.__dict__.copy()
+        state["_shm"] = None
+        return state
+
+    def __repr__(self) -> str:
+        if self.path is not None:
+            return "SharedEmbeddings(path=%r, shape=%r)" % (self.path, self.shape)
+        return "SharedEmbeddings(name=%r, shape=%r)" % (self.name, self.shape)
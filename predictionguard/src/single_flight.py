@@ -0,0 +1,85 @@
+import copy
+import threading
+
+from typing import Any, Callable, Hashable
+
+
+class _Call:
+    def __init__(self):
+        self.done = threading.Event()
+        self.waiters = 0
+        self.result = None
+        self.error = None
+
+
+class SingleFlight:
+    """
+    SingleFlight coalesces identical requests that are in flight at the same
+    time. The first caller for a key makes the request; callers arriving
+    with the same key before it finishes wait for it and receive a deep copy
+    of its result, or the same exception, instead of sending their own.
+
+    Embeddings, Rerank and Models coalesce by default. Chat and Completions
+    do not, since sampled generations are expected to differ between calls,
+    but it can be turned on for deterministic workloads. Set the
+    single_flight attribute of an endpoint to None to turn it off.
+
+    Usage::
+
+        from predictionguard import PredictionGuard
+        from predictionguard.src.single_flight import SingleFlight
+
+        client = PredictionGuard()
+
+        # Share one request between concurrent identical chat calls.
+        client.chat.completions.single_flight = SingleFlight()
+
+        # Send every embeddings request on its own.
+        client.embeddings.single_flight = None
+    """
+
+    def __init__(self):
+        self._calls = {}
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self._calls)
+
+    def do(self, key: Hashable, function: Callable[[], Any]) -> Any:
+        """
+        Calls function, unless a call with the same key is already in flight,
+        in which case its result is awaited and a copy of it is returned.
+
+        :param key: Canonical key of the request, such as its path and serialized payload.
+        :param function: Callable making the request.
+        :return: The result of function.
+        """
+
+        with self._lock:
+            call = self._calls.get(key)
+            leader = call is None
+            if leader:
+                call = self._calls[key] = _Call()
+            else:
+                call.waiters += 1
+
+        if not leader:
+            call.done.wait()
+            if call.error is not None:
+                raise call.error
+            return copy.deepcopy(call.result)
+
+        try:
+            call.result = function()
+            return call.result
+        except BaseException as error:
+            call.error = error
+            raise
+        finally:
+            with self._lock:
+                del self._calls[key]
+                # Waiters copy from a snapshot, so the leader's caller can
+                # change its result without affecting them.
+                if call.waiters and call.error is None:
+                    call.result = copy.deepcopy(call.result)
+            call.done.set()
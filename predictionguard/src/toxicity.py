@@ -1,8 +1,10 @@
 import json
 
 import requests
-from typing import Any, Dict
+from typing import Any, Callable, Dict, Optional
 
+from .cache import TieredCache, cached_checks
+from .columns import map_column, map_parallel
 from ..version import __version__
 
 
@@ -42,6 +44,31 @@ class Toxicity:
         self.api_key = api_key
         self.url = url
         self.timeout = timeout
+        self._cache = None
+
+    def enable_cache(
+        self,
+        max_items: int = 10000,
+        ttl: Optional[float] = None,
+        path: Optional[str] = None
+    ) -> None:
+        """
+        Caches the result of every text, keyed by a hash of the text, so
+        texts that were checked before are not sent again.
+
+        :param max_items: Maximum number of results kept in memory.
+        :param ttl: Seconds a result stays valid, or None to keep results until evicted.
+        :param path: Path of a SQLite database shared between processes, or None for a memory only cache.
+        """
+
+        self._cache = TieredCache(max_items, ttl, path)
+
+    def disable_cache(self) -> None:
+        """
+        Sends every check again, discarding the cached results.
+        """
+
+        self._cache = None
 
     def check(self, text: str) -> Dict[str, Any]:
         """
@@ -50,10 +77,39 @@ class Toxicity:
         :param text: The text to check for toxicity.
         """
 
+        if self._cache is not None:
+            return cached_checks(self._cache, ["/toxicity"], text, self._generate_score)
+
         # Run _generate_score
         choices = self._generate_score(text)
         return choices
 
+    def check_column(
+        self,
+        column: Any,
+        max_workers: int = 8,
+        chunk_size: int = 1000,
+        progress: Optional[Callable[[int, Optional[int]], None]] = None
+    ) -> Any:
+        """
+        Checks the toxicity of every value of a pandas/Polars Series with
+        concurrent requests and returns an aligned Series of scores.
+
+        :param column: A pandas/Polars Series or list of texts, or an iterator of them for data larger than memory.
+        :param max_workers: Maximum number of requests in flight at once.
+        :param chunk_size: Number of rows processed before progress is reported.
+        :param progress: Optional callable invoked with (rows done, total rows or None).
+        :return: A Series of toxicity scores of the same kind as column, or an iterator of them.
+        """
+
+        def score(text):
+            return self.check(text)["checks"][0]["score"]
+
+        def check(values):
+            return map_parallel(values, score, max_workers)
+
+        return map_column(column, check, chunk_size, progress, name="toxicity")
+
     def _generate_score(self, text):
         """
         Function to generate a single toxicity score.
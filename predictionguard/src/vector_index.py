@@ -0,0 +1,417 @@
+import os
+import json
+
+from typing import Any, List, Optional, Sequence, Tuple
+
+from .cache import EmbeddingsCache
+from .optional import import_numpy
+
+
+class VectorIndex:
+    """
+    VectorIndex is an in-process vector search index over a float32 matrix.
+    Queries are scored against every stored vector with a single BLAS matrix
+    multiply, or, once train is called, only against the vectors in the
+    closest IVF partitions. Vectors can be added and deleted incrementally and
+    the index can be saved and memory-mapped back in. Ids can be any hashable
+    value, but only indexes with string and integer ids can be saved.
+
+    Usage::
+
+        from predictionguard import PredictionGuard
+        from predictionguard.src.vector_index import VectorIndex
+
+        client = PredictionGuard()
+        index = VectorIndex()
+
+        index.add_texts(
+            client.embeddings,
+            "bge-m3",
+            ["Deep Learning is pizza.", "Deep Learning is not pizza."],
+            ids=["doc-1", "doc-2"]
+        )
+
+        ids, scores = index.search_texts(client.embeddings, "bge-m3", "What is Deep Learning?", k=1)
+    """
+
+    def __init__(self, dim: Optional[int] = None, metric: str = "cosine"):
+        """
+        :param dim: Size of the vectors. Taken from the first vectors added when not given.
+        :param metric: "cosine" to normalize vectors, or "dot" for raw inner products.
+        """
+
+        if metric not in ("cosine", "dot"):
+            raise ValueError("Please enter either 'cosine' or 'dot' for the metric value.")
+
+        self.dim = dim
+        self.metric = metric
+
+        self._vectors = None
+        self._ids = []
+        self._rows = {}
+        self._active = None
+        self._count = 0
+        self._deleted = 0
+
+        self._centroids = None
+        self._assignments = None
+        self._lists = None
+
+    def __len__(self) -> int:
+        return self._count - self._deleted
+
+    def __contains__(self, id: Any) -> bool:
+        return id in self._rows
+
+    @property
+    def ids(self) -> List[Any]:
+        return [id for row, id in enumerate(self._ids) if self._active[row]]
+
+    def add(self, ids: Sequence[Any], vectors: Any) -> None:
+        """
+        Adds vectors under the given ids, replacing any vector already stored under an id.
+
+        :param ids: Ids of the vectors, in the same order as vectors.
+        :param vectors: An (n, dim) matrix of vectors.
+        """
+
+        np = import_numpy()
+
+        vectors = np.atleast_2d(np.asarray(vectors, dtype=np.float32))
+        if len(ids) != vectors.shape[0]:
+            raise ValueError("Please enter the same number of ids and vectors.")
+        if self.dim is None:
+            self.dim = vectors.shape[1]
+        if vectors.shape[1] != self.dim:
+            raise ValueError("Please enter vectors with %d dimensions." % self.dim)
+
+        vectors = self._prepare(vectors)
+        self._reserve(self._count + len(ids))
+
+        for id, vector in zip(ids, vectors):
+            row = self._rows.get(id)
+            if row is None:
+                row = self._count
+                self._count += 1
+                self._ids.append(id)
+                self._rows[id] = row
+            elif self._lists is not None:
+                self._lists[self._assignments[row]].remove(row)
+
+            self._vectors[row] = vector
+            self._active[row] = True
+
+            if self._centroids is not None:
+                # Vectors added after training join their closest partition.
+                assignment = int(np.argmax(self._centroids @ vector))
+                self._assignments[row] = assignment
+                self._lists[assignment].append(row)
+
+    def delete(self, ids: Sequence[Any]) -> None:
+        """
+        Removes the vectors stored under the given ids. Unknown ids are ignored.
+        """
+
+        for id in ids:
+            row = self._rows.pop(id, None)
+            if row is None:
+                continue
+            self._active[row] = False
+            self._deleted += 1
+            if self._lists is not None:
+                self._lists[self._assignments[row]].remove(row)
+
+        # Reclaim space once most of the matrix is tombstones.
+        if self._deleted > 1024 and self._deleted * 2 > self._count:
+            self.compact()
+
+    def compact(self) -> None:
+        """
+        Drops deleted rows from the matrix.
+        """
+
+        np = import_numpy()
+
+        if self._count == 0:
+            return
+
+        keep = np.flatnonzero(self._active[:self._count])
+        self._vectors = np.array(self._vectors[keep])
+        self._ids = [self._ids[row] for row in keep]
+        self._rows = {id: row for row, id in enumerate(self._ids)}
+        self._active = np.ones(len(keep), dtype=bool)
+        self._count = len(keep)
+        self._deleted = 0
+
+        if self._centroids is not None:
+            self._assignments = np.array(self._assignments[keep])
+            self._build_lists()
+
+    def train(self, n_lists: int, iterations: int = 10, seed: int = 0) -> None:
+        """
+        Partitions the stored vectors into n_lists clusters with k-means, so
+        later searches only score the vectors in the closest partitions.
+
+        :param n_lists: Number of partitions.
+        :param iterations: Number of k-means iterations.
+        :param seed: Seed for choosing the initial centroids.
+        """
+
+        np = import_numpy()
+
+        self.compact()
+        if n_lists < 1 or n_lists > self._count:
+            raise ValueError("Please enter an n_lists value between 1 and the number of vectors.")
+
+        vectors = self._vectors[:self._count]
+        rng = np.random.default_rng(seed)
+        centroids = vectors[rng.choice(self._count, n_lists, replace=False)].copy()
+
+        for _ in range(iterations):
+            assignments = np.argmax(vectors @ centroids.T, axis=1)
+            for cluster in range(n_lists):
+                members = vectors[assignments == cluster]
+                if len(members):
+                    centroids[cluster] = members.mean(axis=0)
+            if self.metric == "cosine":
+                centroids = self._normalize(centroids)
+
+        self._centroids = centroids
+        self._assignments = np.zeros(self._vectors.shape[0], dtype=np.int32)
+        self._assignments[:self._count] = np.argmax(vectors @ centroids.T, axis=1)
+        self._build_lists()
+
+    def search(self, queries: Any, k: int = 10, n_probe: int = 4) -> Tuple[Any, Any]:
+        """
+        Finds the k most similar stored vectors for each query.
+
+        :param queries: A (dim,) query vector or an (m, dim) matrix of queries.
+        :param k: Number of results per query.
+        :param n_probe: Number of IVF partitions searched per query once trained.
+        :return: A tuple of ids and float32 scores, each ordered best first. For a
+            single query these are a list and a (k,) array, otherwise a list of
+            lists and an (m, k) array. Once trained, queries whose partitions hold
+            fewer results than the others are padded with None ids and -inf scores.
+        """
+
+        np = import_numpy()
+
+        queries = np.asarray(queries, dtype=np.float32)
+        single = queries.ndim == 1
+        queries = self._prepare(np.atleast_2d(queries))
+
+        if len(self) == 0:
+            ids = [[] for _ in range(queries.shape[0])]
+            scores = np.zeros((queries.shape[0], 0), dtype=np.float32)
+        elif self._centroids is None:
+            ids, scores = self._search_rows(queries, None, k)
+        else:
+            ids = []
+            scores = []
+            probes = np.argsort(-(queries @ self._centroids.T), axis=1)[:, :n_probe]
+            for query, probe in zip(queries, probes):
+                rows = np.fromiter(
+                    (row for cluster in probe for row in self._lists[cluster]), dtype=np.int64
+                )
+                query_ids, query_scores = self._search_rows(query[None, :], rows, k)
+                ids.append(query_ids[0])
+                scores.append(query_scores[0])
+            width = max(len(row) for row in scores)
+            ids = [row + [None] * (width - len(row)) for row in ids]
+            scores = np.array(
+                [np.pad(row, (0, width - len(row)), constant_values=-np.inf) for row in scores],
+                dtype=np.float32
+            )
+
+        if single:
+            return ids[0], scores[0]
+        return ids, scores
+
+    def add_texts(
+        self,
+        embeddings: Any,
+        model: str,
+        texts: Sequence[Any],
+        ids: Optional[Sequence[Any]] = None,
+        cache: Optional[EmbeddingsCache] = None,
+        **kwargs: Any
+    ) -> None:
+        """
+        Embeds texts with Embeddings.create_batch and adds the vectors.
+
+        :param embeddings: The client Embeddings object, e.g. client.embeddings.
+        :param model: Model to use for embeddings
+        :param texts: Inputs to embed.
+        :param ids: Ids of the texts. Defaults to consecutive integers after the current size.
+        :param cache: Optional EmbeddingsCache checked before sending.
+        :param kwargs: Further options passed on to create_batch.
+        """
+
+        if ids is None:
+            ids = list(range(self._count, self._count + len(texts)))
+
+        vectors = embeddings.create_batch(
+            model, list(texts), return_type="numpy", cache=cache, **kwargs
+        )
+        self.add(ids, vectors)
+
+    def search_texts(
+        self,
+        embeddings: Any,
+        model: str,
+        queries: Any,
+        k: int = 10,
+        n_probe: int = 4,
+        cache: Optional[EmbeddingsCache] = None,
+        **kwargs: Any
+    ) -> Tuple[Any, Any]:
+        """
+        Embeds one or more query texts with Embeddings.create_batch and searches for them.
+
+        :param embeddings: The client Embeddings object, e.g. client.embeddings.
+        :param model: Model to use for embeddings
+        :param queries: A query text or a list of query texts.
+        :param k: Number of results per query.
+        :param n_probe: Number of IVF partitions searched per query once trained.
+        :param cache: Optional EmbeddingsCache checked before sending.
+        :param kwargs: Further options passed on to create_batch.
+        :return: The same ids and scores as search.
+        """
+
+        single = type(queries) is str
+        vectors = embeddings.create_batch(
+            model, [queries] if single else list(queries), return_type="numpy", cache=cache, **kwargs
+        )
+        return self.search(vectors[0] if single else vectors, k=k, n_probe=n_probe)
+
+    def save(self, path: str) -> None:
+        """
+        Writes the index to a directory that load can memory-map back in.
+        """
+
+        np = import_numpy()
+
+        # Ids are stored as JSON, which only round-trips strings and integers.
+        for id in self._ids:
+            if type(id) not in (str, int):
+                raise ValueError(
+                    "Could not save the index. Only string and integer ids can be saved, got %r." % (id,)
+                )
+
+        self.compact()
+        os.makedirs(path, exist_ok=True)
+
+        np.save(os.path.join(path, "vectors.npy"), self._vectors[:self._count])
+        if self._centroids is not None:
+            np.save(os.path.join(path, "centroids.npy"), self._centroids)
+            np.save(os.path.join(path, "assignments.npy"), self._assignments[:self._count])
+
+        with open(os.path.join(path, "index.json"), "w") as meta_file:
+            json.dump({"dim": self.dim, "metric": self.metric, "ids": self._ids}, meta_file)
+
+    @classmethod
+    def load(cls, path: str, mmap: bool = True) -> "VectorIndex":
+        """
+        Loads an index written by save. With mmap the vectors stay on disk and
+        are only copied into memory when the index is first modified.
+        """
+
+        np = import_numpy()
+
+        with open(os.path.join(path, "index.json"), "r") as meta_file:
+            meta = json.load(meta_file)
+
+        index = cls(dim=meta["dim"], metric=meta["metric"])
+        index._vectors = np.load(
+            os.path.join(path, "vectors.npy"), mmap_mode="r" if mmap else None
+        )
+        index._ids = meta["ids"]
+        index._rows = {id: row for row, id in enumerate(index._ids)}
+        index._count = len(index._ids)
+        index._active = np.ones(index._count, dtype=bool)
+
+        if os.path.exists(os.path.join(path, "centroids.npy")):
+            index._centroids = np.load(os.path.join(path, "centroids.npy"))
+            index._assignments = np.load(os.path.join(path, "assignments.npy"))
+            index._build_lists()
+
+        return index
+
+    def _prepare(self, vectors):
+        if self.metric == "cosine":
+            return self._normalize(vectors)
+        return vectors
+
+    def _normalize(self, vectors):
+        np = import_numpy()
+
+        norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+        return vectors / np.where(norms > 0, norms, 1.0)
+
+    def _reserve(self, rows):
+        """
+        Function to grow the matrix geometrically so adds stay amortized O(1).
+        Small indexes, such as one per SemanticCache scope, start at 16 rows.
+        """
+
+        np = import_numpy()
+
+        capacity = 0 if self._vectors is None else self._vectors.shape[0]
+        if rows <= capacity and self._vectors.flags.writeable:
+            return
+
+        capacity = max(rows, capacity * 2, 16)
+        vectors = np.zeros((capacity, self.dim), dtype=np.float32)
+        active = np.zeros(capacity, dtype=bool)
+        if self._vectors is not None:
+            vectors[:self._count] = self._vectors[:self._count]
+            active[:self._count] = self._active[:self._count]
+        self._vectors = vectors
+        self._active = active
+
+        if self._assignments is not None:
+            assignments = np.zeros(capacity, dtype=np.int32)
+            assignments[:self._count] = self._assignments[:self._count]
+            self._assignments = assignments
+
+    def _build_lists(self):
+        np = import_numpy()
+
+        self._lists = [[] for _ in range(self._centroids.shape[0])]
+        for row in np.flatnonzero(self._active[:self._count]):
+            self._lists[self._assignments[row]].append(int(row))
+
+    def _search_rows(self, queries, rows, k):
+        """
+        Function to score queries against the given rows, or all rows, and
+        keep the top k of each with a partial sort.
+        """
+
+        np = import_numpy()
+
+        if rows is None:
+            rows = np.flatnonzero(self._active[:self._count])
+            if len(rows) == self._count:
+                candidates = self._vectors[:self._count]
+                rows = None
+            else:
+                candidates = self._vectors[rows]
+        else:
+            candidates = self._vectors[rows]
+
+        scores = queries @ candidates.T
+        k = min(k, scores.shape[1])
+        if k == 0:
+            return [[] for _ in range(queries.shape[0])], np.zeros((queries.shape[0], 0), dtype=np.float32)
+
+        top = np.argpartition(-scores, k - 1, axis=1)[:, :k]
+        top_scores = np.take_along_axis(scores, top, axis=1)
+        order = np.argsort(-top_scores, axis=1)
+        top = np.take_along_axis(top, order, axis=1)
+        top_scores = np.take_along_axis(top_scores, order, axis=1)
+
+        if rows is not None:
+            top = rows[top]
+
+        ids = [[self._ids[row] for row in query_rows] for query_rows in top]
+        return ids, top_scores.astype(np.float32)
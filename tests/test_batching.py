@@ -0,0 +1,48 @@
+import threading
+
+from predictionguard.src.batching import MicroBatcher, split_checks
+
+
+def test_micro_batcher():
+    batches = []
+
+    def function(key, items):
+        batches.append((key, list(items)))
+        return [key + item for item in items]
+
+    batcher = MicroBatcher(function, max_wait=0.05, max_batch_size=4)
+
+    barrier = threading.Barrier(10)
+    results = [None] * 10
+
+    def run(index):
+        barrier.wait()
+        results[index] = batcher.submit("a" if index % 2 else "b", str(index))
+
+    threads = [threading.Thread(target=run, args=(index,)) for index in range(10)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert results == [("a" if index % 2 else "b") + str(index) for index in range(10)]
+    assert len(batches) < 10
+    assert all(len(items) <= 4 for _, items in batches)
+    assert all(all(int(item) % 2 == (key == "a") for item in items) for key, items in batches)
+
+
+def test_split_checks():
+    response = {
+        "id": "injection-1",
+        "object": "injection_check",
+        "checks": [
+            {"probability": 0.0, "index": 1, "status": "success"},
+            {"probability": 1.0, "index": 0, "status": "success"},
+        ],
+    }
+
+    first, second = split_checks(response, 2)
+
+    assert first["id"] == "injection-1"
+    assert first["checks"] == [{"probability": 1.0, "index": 0, "status": "success"}]
+    assert second["checks"] == [{"probability": 0.0, "index": 0, "status": "success"}]
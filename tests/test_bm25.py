@@ -0,0 +1,59 @@
+import os
+
+from predictionguard import PredictionGuard
+from predictionguard.src.bm25 import BM25Index
+
+
+def _index():
+    index = BM25Index()
+    index.add(
+        ["pizza", "learning", "cats"],
+        [
+            "Pizza is baked with cheese and tomato.",
+            "Deep Learning trains neural networks on data.",
+            "Cats sleep most of the day.",
+        ],
+    )
+    return index
+
+
+def test_bm25_search():
+    index = _index()
+
+    results = index.search("deep learning", n=2)
+
+    assert results[0][0] == "learning"
+    assert len(results) == 1
+
+
+def test_bm25_search_no_results():
+    index = _index()
+
+    assert index.search("deep learning", n=0) == []
+    assert index.search("deep learning", n=-1) == []
+
+
+def test_bm25_delete():
+    index = _index()
+
+    index.delete(["learning"])
+    index.add(["learning-2"], ["Learning to bake pizza."])
+
+    assert [id for id, _ in index.search("learning")] == ["learning-2"]
+    assert len(index) == 3
+
+
+def test_bm25_rerank():
+    test_client = PredictionGuard()
+
+    index = _index()
+
+    response = index.rerank(
+        test_client.rerank,
+        model=os.environ["TEST_RERANK_MODEL"],
+        query="What is Deep Learning?",
+        n=2,
+    )
+
+    assert response["results"][0]["id"] == "learning"
+    assert type(response["results"][0]["relevance_score"]) is float
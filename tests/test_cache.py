@@ -0,0 +1,132 @@
+import time
+
+import pytest
+
+from predictionguard.src.cache import (
+    EmbeddingsCache, LRUCache, SQLiteCache, TieredCache, cached_checks, response_key
+)
+
+
+def test_lru_cache_eviction():
+    cache = LRUCache(max_items=2)
+
+    cache.set("a", 1)
+    cache.set("b", 2)
+    cache.get("a")
+    cache.set("c", 3)
+
+    assert cache.get("a") == 1
+    assert cache.get("b") is None
+    assert cache.get("c") == 3
+
+
+def test_lru_cache_ttl():
+    cache = LRUCache(max_items=2, ttl=0.01)
+
+    cache.set("a", 1)
+    time.sleep(0.02)
+
+    assert cache.get("a") is None
+
+
+def test_sqlite_cache(tmp_path):
+    path = str(tmp_path / "cache.sqlite")
+
+    cache = SQLiteCache(path)
+    cache.set("a", {"choices": [1, 2]})
+    cache.set("b", "text")
+
+    reopened = SQLiteCache(path)
+
+    assert reopened.get("a") == {"choices": [1, 2]}
+    assert reopened.get_many(["b", "c"]) == ["text", None]
+    assert len(reopened) == 2
+
+
+def test_sqlite_cache_ttl(tmp_path):
+    cache = SQLiteCache(str(tmp_path / "cache.sqlite"), ttl=0.01)
+
+    cache.set("a", 1)
+    time.sleep(0.02)
+
+    assert cache.get("a") is None
+    assert cache.get_many(["a"]) == [None]
+
+
+def test_tiered_cache_shared(tmp_path):
+    path = str(tmp_path / "cache.sqlite")
+    TieredCache(path=path).set("a", {"value": 1})
+
+    cache = TieredCache(path=path)
+
+    assert cache.get_many(["a", "b"]) == [{"value": 1}, None]
+    assert cache.memory.get("a") == {"value": 1}
+
+
+def test_cached_checks():
+    cache = LRUCache()
+    sent = []
+
+    def request(prompt):
+        sent.append(prompt)
+        prompts = [prompt] if type(prompt) is str else prompt
+        return {
+            "object": "injection_check",
+            "checks": [{"index": i, "probability": len(text) / 10} for i, text in enumerate(prompts)],
+        }
+
+    first = cached_checks(cache, ["/injection", True], "hello", request)
+    second = cached_checks(cache, ["/injection", True], ["hi", "hello", "hi"], request)
+
+    assert sent == ["hello", ["hi"]]
+    assert first["checks"] == [{"index": 0, "probability": 0.5}]
+    assert second["object"] == "injection_check"
+    assert [check["probability"] for check in second["checks"]] == [0.2, 0.5, 0.2]
+    assert [check["index"] for check in second["checks"]] == [0, 1, 2]
+
+    cached_checks(cache, ["/injection", False], "hello", request)
+    assert sent[-1] == "hello"
+
+
+def test_response_key_ignores_stream():
+    payload = {"model": "m", "messages": "Hi", "temperature": 0.0, "stream": False}
+
+    assert response_key("/chat/completions", payload) == response_key(
+        "/chat/completions", dict(payload, stream=True, stream_options={"include_usage": True})
+    )
+    assert response_key("/chat/completions", payload) != response_key("/completions", payload)
+
+
+def test_embeddings_cache_disk(tmp_path):
+    numpy = pytest.importorskip("numpy")
+
+    cache = EmbeddingsCache(path=str(tmp_path), max_items=1)
+    key = cache.key("bge-m3", "Some text", False, "Right")
+
+    cache.put(key, [0.5, -1.0, 2.0])
+    cache.put(cache.key("bge-m3", "Other text", False, "Right"), [1.0, 1.0, 1.0])
+
+    reopened = EmbeddingsCache(path=str(tmp_path))
+    vector = reopened.get(key)
+
+    assert vector.dtype == numpy.float32
+    assert vector.tolist() == [0.5, -1.0, 2.0]
+    assert reopened.get(cache.key("bge-m3", "Some text", True, "Right")) is None
+
+
+def test_embeddings_cache_disk_writers(tmp_path):
+    pytest.importorskip("numpy")
+
+    first = EmbeddingsCache(path=str(tmp_path), max_items=1)
+    second = EmbeddingsCache(path=str(tmp_path), max_items=1)
+    keys = [first.key("bge-m3", "Text " + str(i), False, "Right") for i in range(6)]
+
+    # Writers sharing the directory append rows without overwriting each other.
+    for i, key in enumerate(keys):
+        (first if i % 2 == 0 else second).put(key, [float(i), 0.0])
+
+    assert first.get(keys[0]).tolist() == [0.0, 0.0]
+    assert second.get(keys[1]).tolist() == [1.0, 0.0]
+
+    reopened = EmbeddingsCache(path=str(tmp_path))
+    assert [reopened.get(key).tolist() for key in keys] == [[float(i), 0.0] for i in range(6)]
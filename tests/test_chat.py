@@ -1,9 +1,11 @@
 import os
+import json
 import base64
 
 import pytest
 
 from predictionguard import PredictionGuard
+from predictionguard.src.cache import SQLiteCache
 
 
 def test_chat_completions_create():
@@ -48,6 +50,76 @@ def test_chat_completions_create_stream():
     assert len(response_list) > 1
 
 
+def test_chat_completions_create_raw():
+    test_client = PredictionGuard()
+
+    response = test_client.chat.completions.create(
+        model=os.environ["TEST_CHAT_MODEL"],
+        messages=[
+            {"role": "system", "content": "You are a helpful chatbot."},
+            {"role": "user", "content": "Tell me a joke."},
+        ],
+        raw=True,
+    )
+
+    assert type(response) is bytes
+    assert len(json.loads(response)["choices"][0]["message"]["content"]) > 0
+
+
+def test_chat_completions_create_stream_raw():
+    test_client = PredictionGuard()
+
+    inspected = []
+    response_list = []
+    for frame in test_client.chat.completions.create(
+        model=os.environ["TEST_CHAT_MODEL"],
+        messages=[
+            {"role": "system", "content": "You are a helpful chatbot."},
+            {"role": "user", "content": "Tell me a joke."},
+        ],
+        stream=True,
+        raw=True,
+        raw_hook=inspected.append,
+    ):
+        response_list.append(frame)
+
+    assert len(response_list) > 1
+    assert response_list == inspected
+    assert response_list[0].startswith(b"data")
+
+
+def test_chat_completions_create_cache(tmp_path):
+    test_client = PredictionGuard()
+
+    cache = SQLiteCache(str(tmp_path / "responses.sqlite"), ttl=60)
+
+    response = test_client.chat.completions.create(
+        model=os.environ["TEST_CHAT_MODEL"],
+        messages="Tell me a joke",
+        temperature=0.0,
+        cache=cache,
+    )
+    cached = test_client.chat.completions.create(
+        model=os.environ["TEST_CHAT_MODEL"],
+        messages="Tell me a joke",
+        temperature=0.0,
+        cache=cache,
+    )
+    replayed = list(test_client.chat.completions.create(
+        model=os.environ["TEST_CHAT_MODEL"],
+        messages="Tell me a joke",
+        temperature=0.0,
+        stream=True,
+        cache=cache,
+    ))
+
+    assert cached == response
+    assert len(cache) == 1
+    assert replayed[0]["data"]["choices"][0]["delta"]["content"] == (
+        response["choices"][0]["message"]["content"]
+    )
+
+
 def test_chat_completions_create_stream_output_fail():
     test_client = PredictionGuard()
 
@@ -51,6 +51,22 @@ def test_completions_create_stream():
     assert len(response_list) > 1
 
 
+def test_completions_create_stream_raw():
+    test_client = PredictionGuard()
+
+    response_list = []
+    for frame in test_client.completions.create(
+        model=os.environ["TEST_CHAT_MODEL"],
+        prompt="Tell me a joke.",
+        stream=True,
+        raw=True,
+    ):
+        response_list.append(frame)
+
+    assert len(response_list) > 1
+    assert response_list[0].startswith(b"data")
+
+
 def test_completions_create_stream_output_fail():
     test_client = PredictionGuard()
 
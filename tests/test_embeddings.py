@@ -1,9 +1,95 @@
 import os
+import json
 import base64
+import struct
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
 
 from predictionguard import PredictionGuard
 
 
+class _StandInEmbeddingsHandler(BaseHTTPRequestHandler):
+    """Minimal /embeddings server that honors encoding_format."""
+
+    def log_message(self, *args):
+        pass
+
+    def _send(self, body):
+        body = json.dumps(body).encode("utf-8")
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def do_GET(self):
+        self._send({})
+
+    def do_POST(self):
+        payload = json.loads(self.rfile.read(int(self.headers["Content-Length"])))
+
+        self.server.requests += 1
+        self.server.payloads.append(payload)
+        status = self.server.failures.pop(0) if self.server.failures else 200
+        if status != 200:
+            body = json.dumps({"error": "stand-in failure"}).encode("utf-8")
+            self.send_response(status)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+            return
+
+        inputs = payload["input"]
+        if type(inputs) is not list:
+            inputs = [inputs]
+
+        data = []
+        for index, text in enumerate(inputs):
+            vector = [len(text) / 4, -0.5, index + 0.25]
+            if payload.get("encoding_format") == "base64" and not self.server.floats_only:
+                vector = base64.b64encode(struct.pack("<3f", *vector)).decode("utf-8")
+            data.append({"embedding": vector, "index": index, "object": "embedding"})
+
+        usage = {"prompt_tokens": len(inputs), "total_tokens": len(inputs)}
+        self._send(
+            {"id": "emb-0", "object": "list", "model": payload["model"], "data": data, "usage": usage}
+        )
+
+
+def _embed_shared_memory(job):
+    url, inputs = job
+    client = PredictionGuard(api_key="stand-in", url=url)
+    return client.embeddings.create_batch(
+        model="stand-in", input=inputs, batch_size=3, return_type="shared_memory"
+    )
+
+
+@pytest.fixture
+def stand_in_client():
+    server = ThreadingHTTPServer(("127.0.0.1", 0), _StandInEmbeddingsHandler)
+    # Status codes of the next responses, and the number of requests seen.
+    server.failures = []
+    server.requests = 0
+    server.payloads = []
+    # Whether encoding_format is ignored, like servers without base64 support.
+    server.floats_only = False
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+
+    client = PredictionGuard(
+        api_key="stand-in", url="http://127.0.0.1:%d" % server.server_address[1]
+    )
+    client.server = server
+    yield client
+
+    server.shutdown()
+    server.server_close()
+
+
 def test_embeddings_create_text():
     test_client = PredictionGuard()
 
@@ -206,6 +292,389 @@ def test_embeddings_create_both_batch():
     assert type(response["data"][1]["embedding"][0]) is float
 
 
+def test_embeddings_create_batch():
+    test_client = PredictionGuard()
+
+    inputs = ["Test embeddings number " + str(i) for i in range(25)]
+
+    response = test_client.embeddings.create_batch(
+        model=os.environ["TEST_TEXT_EMBEDDINGS_MODEL"],
+        input=inputs,
+        batch_size=4,
+        max_workers=3,
+    )
+
+    assert len(response["data"]) == len(inputs)
+    assert [item["index"] for item in response["data"]] == list(range(len(inputs)))
+    assert type(response["data"][0]["embedding"][0]) is float
+
+
+def test_embeddings_create_numpy():
+    numpy = pytest.importorskip("numpy")
+
+    test_client = PredictionGuard()
+
+    inputs = ["Test embeddings", "More test embeddings"]
+
+    response = test_client.embeddings.create(
+        model=os.environ["TEST_TEXT_EMBEDDINGS_MODEL"], input=inputs, return_type="numpy"
+    )
+
+    assert response.dtype == numpy.float32
+    assert response.shape[0] == 2
+    assert response.shape[1] > 0
+
+
+def test_embeddings_create_batch_numpy_out():
+    numpy = pytest.importorskip("numpy")
+
+    test_client = PredictionGuard()
+
+    inputs = ["Test embeddings number " + str(i) for i in range(10)]
+
+    first = test_client.embeddings.create(
+        model=os.environ["TEST_TEXT_EMBEDDINGS_MODEL"], input=inputs[:1], return_type="numpy"
+    )
+    out = numpy.zeros((len(inputs), first.shape[1]), dtype=numpy.float32)
+
+    response = test_client.embeddings.create_batch(
+        model=os.environ["TEST_TEXT_EMBEDDINGS_MODEL"],
+        input=inputs,
+        batch_size=3,
+        return_type="numpy",
+        out=out,
+    )
+
+    assert response is out
+    assert numpy.allclose(out[0], first[0], atol=1e-4)
+
+
+def test_embeddings_create_base64(stand_in_client):
+    inputs = ["Test embeddings", "More test embeddings"]
+
+    expected = stand_in_client.embeddings.create(model="stand-in", input=inputs)
+    response = stand_in_client.embeddings.create(
+        model="stand-in", input=inputs, encoding_format="base64"
+    )
+
+    assert [item["embedding"] for item in response["data"]] == [
+        item["embedding"] for item in expected["data"]
+    ]
+
+
+def test_embeddings_create_base64_fallback(stand_in_client):
+    numpy = pytest.importorskip("numpy")
+
+    stand_in_client.server.floats_only = True
+    inputs = ["Test embeddings number " + str(i) for i in range(4)]
+
+    expected = stand_in_client.embeddings.create(model="stand-in", input=inputs)
+    floats = stand_in_client.embeddings.create_batch(
+        model="stand-in", input=inputs, batch_size=2, return_type="numpy"
+    )
+    vectors = stand_in_client.embeddings.create_batch(
+        model="stand-in", input=inputs, batch_size=2, return_type="numpy", encoding_format="base64"
+    )
+    response = stand_in_client.embeddings.create(
+        model="stand-in", input=inputs, encoding_format="base64"
+    )
+
+    assert vectors.dtype == numpy.float32
+    assert vectors.tolist() == floats.tolist()
+    assert response["data"] == expected["data"]
+    # Once the field is seen to be ignored, it is no longer sent.
+    assert "encoding_format" not in stand_in_client.server.payloads[-1]
+
+
+def test_embeddings_create_batch_base64_numpy(stand_in_client):
+    numpy = pytest.importorskip("numpy")
+
+    inputs = ["Test embeddings number " + str(i) for i in range(10)]
+
+    response = stand_in_client.embeddings.create_batch(
+        model="stand-in",
+        input=inputs,
+        batch_size=3,
+        return_type="numpy",
+        encoding_format="base64",
+    )
+
+    assert response.dtype == numpy.float32
+    assert response.shape == (10, 3)
+    assert response[4, 0] == len(inputs[4]) / 4
+    assert response[4, 2] == 1.25
+
+
+def test_embeddings_create_batch_cache(stand_in_client, tmp_path):
+    pytest.importorskip("numpy")
+
+    from predictionguard.src.cache import EmbeddingsCache
+
+    inputs = ["Test embeddings number " + str(i) for i in range(10)]
+    cache = EmbeddingsCache(path=str(tmp_path))
+
+    expected = stand_in_client.embeddings.create_batch(
+        model="stand-in", input=inputs, batch_size=3, return_type="numpy", cache=cache
+    )
+
+    stand_in_client.url = "http://127.0.0.1:1"
+    response = stand_in_client.embeddings.create_batch(
+        model="stand-in", input=inputs, batch_size=3, return_type="numpy", cache=cache
+    )
+
+    assert (response == expected).all()
+
+
+def test_embeddings_create_batch_usage(stand_in_client):
+    inputs = ["Test embeddings number " + str(i) for i in range(10)]
+
+    response = stand_in_client.embeddings.create_batch(
+        model="stand-in", input=inputs, batch_size=3, max_workers=2
+    )
+
+    assert response["usage"] == {"prompt_tokens": 10, "total_tokens": 10}
+
+
+def test_embeddings_create_batch_retries(stand_in_client, monkeypatch):
+    monkeypatch.setattr("predictionguard.src.embeddings._RETRY_DELAY", 0.01)
+
+    stand_in_client.server.failures = [429, 503]
+    response = stand_in_client.embeddings.create_batch(
+        "stand-in", ["alpha", "beta"], batch_size=2, max_workers=1, max_retries=2
+    )
+
+    assert len(response["data"]) == 2
+    assert stand_in_client.server.requests == 3
+
+    stand_in_client.server.failures = [400]
+    stand_in_client.server.requests = 0
+    with pytest.raises(ValueError, match="stand-in failure"):
+        stand_in_client.embeddings.create_batch(
+            "stand-in", ["alpha", "beta"], batch_size=2, max_workers=1, max_retries=2
+        )
+
+    assert stand_in_client.server.requests == 1
+
+
+def test_embeddings_create_batch_deduplicate(stand_in_client):
+    inputs = ["Footer", "A much longer test embeddings input", "Footer", "Header", "Footer"]
+
+    response = stand_in_client.embeddings.create_batch(
+        model="stand-in", input=inputs, batch_size=2
+    )
+
+    assert [item["index"] for item in response["data"]] == list(range(len(inputs)))
+    assert response["data"][0]["embedding"] == response["data"][2]["embedding"]
+    assert response["data"][0]["embedding"] == response["data"][4]["embedding"]
+    assert response["data"][1]["embedding"][0] == len(inputs[1]) / 4
+
+
+def test_embeddings_create_batch_near_duplicates(stand_in_client):
+    from predictionguard.src.near_duplicates import NearDuplicateDetector
+
+    chunk = "Deep Learning is a subset of machine learning built on neural networks with many layers."
+    inputs = [chunk + " Page 1 of 3.", "Header", chunk + " Page 2 of 3.", "Header"]
+
+    response = stand_in_client.embeddings.create_batch(
+        model="stand-in", input=inputs, near_duplicates=NearDuplicateDetector()
+    )
+
+    assert [item["index"] for item in response["data"]] == list(range(len(inputs)))
+    assert response["data"][2]["embedding"] == response["data"][0]["embedding"]
+    assert response["data"][3]["embedding"] == response["data"][1]["embedding"]
+    assert response["data"][0]["embedding"] != response["data"][1]["embedding"]
+
+
+def test_embeddings_iter_embed():
+    test_client = PredictionGuard()
+
+    def inputs():
+        for i in range(12):
+            yield "Test embeddings number " + str(i)
+
+    response = list(
+        test_client.embeddings.iter_embed(
+            os.environ["TEST_TEXT_EMBEDDINGS_MODEL"], inputs(), batch_size=5
+        )
+    )
+
+    assert [index for index, _ in response] == list(range(12))
+    assert type(response[0][1][0]) is float
+
+
+
+def test_embeddings_iter_embed_cache_bounded(stand_in_client):
+    pytest.importorskip("numpy")
+
+    from predictionguard.src.cache import EmbeddingsCache
+
+    inputs = ["Test embeddings number " + str(i) for i in range(5000)]
+    cache = EmbeddingsCache()
+
+    # The first 4000 inputs are cached, after that every fifth is a miss.
+    stand_in_client.embeddings.create_batch(
+        model="stand-in",
+        input=[text for i, text in enumerate(inputs) if i < 4000 or i % 5],
+        return_type="numpy",
+        cache=cache
+    )
+
+    for ordered in (True, False):
+        consumed = []
+
+        def read():
+            for text in inputs:
+                consumed.append(text)
+                yield text
+
+        results = stand_in_client.embeddings.iter_embed(
+            "stand-in", read(), batch_size=16, max_in_flight=2, ordered=ordered, cache=cache
+        )
+
+        first = next(results)
+        # One chunk of hits and the one read ahead of it.
+        assert len(consumed) <= 2 * 16 * 2
+
+        rows = [first[0]] + [row for row, _ in results]
+        if ordered:
+            assert rows == list(range(len(inputs)))
+        else:
+            assert sorted(rows) == list(range(len(inputs)))
+
+
+def test_embeddings_create_batch_quantize(stand_in_client):
+    numpy = pytest.importorskip("numpy")
+
+    inputs = ["Test embeddings number " + str(i) for i in range(10)]
+
+    codes, scales = stand_in_client.embeddings.create_batch(
+        model="stand-in", input=inputs, return_type="numpy", quantize="int8"
+    )
+    bits = stand_in_client.embeddings.create_batch(
+        model="stand-in", input=inputs, return_type="numpy", quantize="binary"
+    )
+
+    assert codes.dtype == numpy.int8
+    assert codes.shape == (10, 3)
+    assert scales.shape == (10,)
+    assert bits.shape == (10, 1)
+
+
+def test_embeddings_write_parquet(stand_in_client, tmp_path):
+    pytest.importorskip("numpy")
+    parquet = pytest.importorskip("pyarrow.parquet")
+
+    inputs = ("Test embeddings number " + str(i) for i in range(10))
+    path = str(tmp_path / "embeddings.parquet")
+
+    rows = stand_in_client.embeddings.write_parquet(
+        path,
+        "stand-in",
+        inputs,
+        ids=("doc-" + str(i) for i in range(10)),
+        batch_size=4,
+    )
+    table = parquet.read_table(path)
+
+    assert rows == 10
+    assert table.column_names == ["id", "input", "embedding"]
+    assert table.column("id").to_pylist()[3] == "doc-3"
+    assert table.schema.field("embedding").type.list_size == 3
+
+
+def test_embeddings_create_column():
+    pandas = pytest.importorskip("pandas")
+
+    test_client = PredictionGuard()
+
+    column = pandas.Series(["Test embeddings", "More test embeddings"], name="text")
+    response = test_client.embeddings.create_column(
+        os.environ["TEST_TEXT_EMBEDDINGS_MODEL"], column
+    )
+
+    assert response.name == "embedding"
+    assert len(response) == 2
+    assert type(response[0][0]) is float
+
+
+def test_embeddings_create_batch_shared_memory(stand_in_client):
+    pytest.importorskip("numpy")
+
+    import pickle
+
+    inputs = ["Test embeddings number " + str(i) for i in range(10)]
+
+    expected = stand_in_client.embeddings.create_batch(
+        model="stand-in", input=inputs, batch_size=3, return_type="numpy"
+    )
+    handle = stand_in_client.embeddings.create_batch(
+        model="stand-in", input=inputs, batch_size=3, return_type="shared_memory"
+    )
+
+    attached = pickle.loads(pickle.dumps(handle))
+    vectors = attached.attach()
+
+    assert (vectors == expected).all()
+
+    del vectors
+    attached.unlink()
+
+
+def test_embeddings_create_batch_shared_memory_failure(stand_in_client, monkeypatch):
+    pytest.importorskip("numpy")
+
+    from predictionguard.src.shared import SharedEmbeddings
+
+    created = []
+    create = SharedEmbeddings.create
+
+    def record(*args, **kwargs):
+        created.append(create(*args, **kwargs))
+        return created[-1]
+
+    monkeypatch.setattr(SharedEmbeddings, "create", record)
+
+    # The second batch fails after the first one has created the block.
+    stand_in_client.server.failures = [200, 400]
+    inputs = ["Test embeddings number " + str(i) for i in range(6)]
+
+    with pytest.raises(ValueError):
+        stand_in_client.embeddings.create_batch(
+            model="stand-in", input=inputs, batch_size=3, max_workers=1, return_type="shared_memory"
+        )
+
+    assert len(created) == 1
+    with pytest.raises(FileNotFoundError):
+        created[0].attach()
+
+
+def test_embeddings_create_batch_shared_memory_pool(stand_in_client):
+    pytest.importorskip("numpy")
+
+    import multiprocessing
+
+    chunks = [["Chunk " + str(chunk) + " text " + str(i) for i in range(5)] for chunk in range(3)]
+
+    with multiprocessing.Pool(3) as pool:
+        handles = pool.map(_embed_shared_memory, [(stand_in_client.url, chunk) for chunk in chunks])
+    pool.join()
+
+    # A block still tracked by an exited worker is unlinked by that worker's
+    # resource tracker shortly after the exit, so give it time to do so.
+    time.sleep(1)
+
+    for chunk, handle in zip(chunks, handles):
+        expected = stand_in_client.embeddings.create_batch(
+            model="stand-in", input=chunk, batch_size=3, return_type="numpy"
+        )
+        vectors = handle.attach()
+
+        assert (vectors == expected).all()
+
+        del vectors
+        handle.unlink()
+
+
 def test_embeddings_list_models():
     test_client = PredictionGuard()
 
@@ -0,0 +1,22 @@
+from predictionguard.src.messages import last_user_turn
+
+
+def test_last_user_turn():
+    messages = [
+        {"role": "system", "content": "You are a helpful assistant."},
+        {"role": "user", "content": "First question"},
+        {"role": "assistant", "content": "First answer"},
+        {
+            "role": "user",
+            "content": [
+                {"type": "text", "text": "What is in this image?"},
+                {"type": "image_url", "image_url": {"url": "https://example.com/image.jpg"}},
+            ],
+        },
+    ]
+
+    assert last_user_turn("Hello") == "Hello"
+    assert last_user_turn(messages[:3]) == "First question"
+    assert last_user_turn(messages) is None
+    assert last_user_turn(messages, skip_non_text=True) == "What is in this image?"
+    assert last_user_turn(messages[:1]) is None
@@ -0,0 +1,52 @@
+import os
+
+from predictionguard import PredictionGuard
+from predictionguard.src.near_duplicates import NearDuplicateDetector
+
+
+_CHUNK = (
+    "Deep Learning is a subset of machine learning that uses neural networks "
+    "with many layers to learn representations of data."
+)
+
+
+def test_near_duplicates_group():
+    detector = NearDuplicateDetector(threshold=0.8)
+
+    groups = detector.group([
+        _CHUNK + " Copyright 2024.",
+        "Pizza is a dish of Italian origin.",
+        _CHUNK.upper() + "  Copyright 2025.",
+        _CHUNK + " Copyright 2024.",
+    ])
+
+    assert groups == [0, 1, 0, 0]
+
+
+def test_near_duplicates_collapse():
+    detector = NearDuplicateDetector()
+    texts = ["Pizza is a dish of Italian origin.", _CHUNK, _CHUNK + " ", "Cats sleep."]
+
+    unique, positions = detector.collapse(texts)
+
+    assert unique == [texts[0], texts[1], texts[3]]
+    assert positions == [0, 1, 1, 2]
+
+
+def test_near_duplicates_rerank():
+    test_client = PredictionGuard()
+
+    documents = [_CHUNK + " Page 1 of 2.", "Pizza is a dish of Italian origin.", _CHUNK + " Page 2 of 2."]
+
+    response = test_client.rerank.create(
+        model=os.environ["TEST_RERANK_MODEL"],
+        query="What is Deep Learning?",
+        documents=documents,
+        near_duplicates=NearDuplicateDetector(),
+    )
+
+    scores = {result["index"]: result["relevance_score"] for result in response["results"]}
+    assert len(scores) == 3
+    assert scores[0] == scores[2]
+    for result in response["results"]:
+        assert result["text"] == documents[result["index"]]
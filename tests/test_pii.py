@@ -11,3 +11,20 @@ def test_pii_check():
     )
 
     assert len(response["checks"][0]["new_prompt"]) > 0
+
+
+def test_pii_check_column():
+    test_client = PredictionGuard()
+
+    progress = []
+    response = test_client.pii.check_column(
+        ["Hello my name is John Doe.", "My SSN is 111-22-3333."],
+        replace=True,
+        replace_method="mask",
+        chunk_size=1,
+        progress=lambda done, total: progress.append((done, total)),
+    )
+
+    assert len(response) == 2
+    assert len(response[0]) > 0
+    assert progress == [(1, 2), (2, 2)]
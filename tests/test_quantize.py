@@ -0,0 +1,36 @@
+import pytest
+
+from predictionguard.src.quantize import (
+    dequantize_int8,
+    hamming_similarity,
+    int8_similarity,
+    quantize_binary,
+    quantize_int8,
+)
+
+numpy = pytest.importorskip("numpy")
+
+
+def test_quantize_int8():
+    vectors = numpy.random.default_rng(0).standard_normal((20, 64)).astype(numpy.float32)
+    vectors /= numpy.linalg.norm(vectors, axis=1, keepdims=True)
+
+    codes, scales = quantize_int8(vectors)
+
+    assert codes.dtype == numpy.int8
+    assert scales.shape == (20,)
+    assert numpy.abs(dequantize_int8(codes, scales) - vectors).max() < 0.01
+
+    similarity = int8_similarity(codes[:2], scales[:2], codes, scales)
+
+    assert similarity.shape == (2, 20)
+    assert numpy.allclose(similarity, vectors[:2] @ vectors.T, atol=0.02)
+
+
+def test_quantize_binary():
+    vectors = numpy.array([[0.5, -0.1, 0.2, -0.3], [-0.5, -0.1, 0.2, 0.3]], dtype=numpy.float32)
+
+    bits = quantize_binary(vectors)
+
+    assert bits.shape == (2, 1)
+    assert hamming_similarity(bits[0], bits, 4).tolist() == [1.0, 0.5]
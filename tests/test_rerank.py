@@ -1,6 +1,8 @@
 import os
 
 from predictionguard import PredictionGuard
+from predictionguard.src.cache import LRUCache
+from predictionguard.src.rerank import Rerank
 
 
 def test_rerank_create():
@@ -22,6 +24,102 @@ def test_rerank_create():
     assert type(response["results"][0]["text"]) is str
 
 
+def test_rerank_create_cache():
+    test_client = PredictionGuard()
+
+    cache = LRUCache(max_items=100, ttl=60)
+    documents = [
+        "Deep Learning is pizza.",
+        "Deep Learning is not pizza.",
+        "Deep Learning is a subset of machine learning."
+    ]
+
+    test_client.rerank.create(
+        model=os.environ["TEST_RERANK_MODEL"],
+        query="What is Deep Learning?",
+        documents=documents[:2],
+        cache=cache,
+    )
+    assert len(cache) == 2
+
+    response = test_client.rerank.create(
+        model=os.environ["TEST_RERANK_MODEL"],
+        query="What is Deep Learning?",
+        documents=documents,
+        cache=cache,
+    )
+
+    scores = [result["relevance_score"] for result in response["results"]]
+    assert len(cache) == 3
+    assert sorted(result["index"] for result in response["results"]) == [0, 1, 2]
+    assert scores == sorted(scores, reverse=True)
+    for result in response["results"]:
+        assert result["text"] == documents[result["index"]]
+
+
+def test_rerank_create_sharded():
+    test_client = PredictionGuard()
+
+    documents = [
+        "Deep Learning is pizza.",
+        "Deep Learning is not pizza.",
+        "Deep Learning is a subset of machine learning.",
+        "Pizza is a dish of Italian origin."
+    ]
+
+    response = test_client.rerank.create_sharded(
+        model=os.environ["TEST_RERANK_MODEL"],
+        query="What is Deep Learning?",
+        documents=documents,
+        shard_size=1,
+        top_n=3,
+    )
+
+    scores = [result["relevance_score"] for result in response["results"]]
+    assert len(response["results"]) == 3
+    assert scores == sorted(scores, reverse=True)
+    for result in response["results"]:
+        assert result["text"] == documents[result["index"]]
+
+
+def test_rerank_create_sharded_stop_score(monkeypatch):
+    rerank = Rerank(api_key="stand-in", url="http://127.0.0.1:1", timeout=1)
+
+    def score(model, query, documents, return_documents):
+        results = [
+            {"index": index, "relevance_score": float(document)}
+            for index, document in enumerate(documents)
+        ]
+        return {"object": "list", "model": model, "results": results}
+
+    monkeypatch.setattr(rerank, "_create_rerank", score)
+
+    # The best document is in the last shard.
+    documents = ["0.9", "0.95", "0.1", "0.99"]
+    options = {"model": "stand-in", "query": "q", "documents": documents, "shard_size": 2, "max_workers": 1}
+
+    exact = rerank.create_sharded(top_n=1, **options)
+    early = rerank.create_sharded(top_n=1, stop_score=0.9, **options)
+
+    assert [result["index"] for result in exact["results"]] == [3]
+    # Stopping early skips the unsent shard, and with it the best document.
+    assert [result["index"] for result in early["results"]] == [1]
+
+
+def test_rerank_score_column():
+    test_client = PredictionGuard()
+
+    response = test_client.rerank.score_column(
+        model=os.environ["TEST_RERANK_MODEL"],
+        query="What is Deep Learning?",
+        column=["Deep Learning is pizza.", "Deep Learning is not pizza."],
+        batch_size=1,
+    )
+
+    assert len(response) == 2
+    assert type(response[0]) is float
+
+
 def test_rerank_list():
     test_client = PredictionGuard()
 
@@ -0,0 +1,38 @@
+import os
+
+import pytest
+
+from predictionguard import PredictionGuard
+from predictionguard.src.retrieval import RetrievalPipeline
+
+
+def test_retrieval_pipeline_query():
+    pytest.importorskip("numpy")
+
+    test_client = PredictionGuard()
+
+    pipeline = RetrievalPipeline(
+        test_client.embeddings,
+        test_client.rerank,
+        embedding_model=os.environ["TEST_TEXT_EMBEDDINGS_MODEL"],
+        rerank_model=os.environ["TEST_RERANK_MODEL"],
+        k=2,
+        n=1,
+    )
+    pipeline.add_documents(
+        ["pizza", "learning", "cats"],
+        [
+            "Pizza is baked with cheese and tomato.",
+            "Deep Learning trains neural networks on data.",
+            "Cats sleep most of the day.",
+        ],
+    )
+
+    response = pipeline.query("What is Deep Learning?")
+    cached = pipeline.query("What is Deep Learning?")
+
+    assert response["results"][0]["id"] == "learning"
+    assert type(response["results"][0]["relevance_score"]) is float
+    assert response["timings"]["total"] >= response["timings"]["rerank"]
+    assert not response["query_cache_hit"]
+    assert cached["query_cache_hit"]
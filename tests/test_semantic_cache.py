@@ -0,0 +1,55 @@
+import os
+
+import pytest
+
+from predictionguard import PredictionGuard
+from predictionguard.src.semantic_cache import SemanticCache
+
+
+def test_semantic_cache_create():
+    pytest.importorskip("numpy")
+
+    test_client = PredictionGuard()
+
+    cache = SemanticCache(
+        test_client.embeddings,
+        test_client.chat.completions,
+        embedding_model=os.environ["TEST_TEXT_EMBEDDINGS_MODEL"],
+        threshold=0.95,
+    )
+
+    messages = [
+        {"role": "system", "content": "You are a helpful chatbot."},
+        {"role": "user", "content": "Tell me a joke."},
+    ]
+
+    response = cache.create(model=os.environ["TEST_CHAT_MODEL"], messages=messages)
+    cached = cache.create(model=os.environ["TEST_CHAT_MODEL"], messages=messages)
+    other_scope = cache.create(
+        model=os.environ["TEST_CHAT_MODEL"],
+        messages=[{"role": "system", "content": "You only speak French."}, messages[1]],
+    )
+
+    metrics = cache.metrics()
+
+    assert cached == response
+    assert len(other_scope["choices"][0]["message"]["content"]) > 0
+    assert len(cache) == 2
+    assert metrics["lookups"] == 3
+    assert metrics["hits"] == 1
+    assert metrics["saved_seconds"] > 0
+
+
+def test_semantic_cache_scope_memory():
+    numpy = pytest.importorskip("numpy")
+
+    cache = SemanticCache(None, None, embedding_model="stand-in")
+    vector = numpy.ones(1024, dtype=numpy.float32)
+
+    for scope in range(100):
+        cache._store(("stand-in", scope), vector, {"choices": []}, 0.1)
+
+    # A scope holding one turn keeps a small matrix, not a full preallocation.
+    assert len(cache._indexes) == 100
+    for index in cache._indexes.values():
+        assert index._vectors.nbytes <= 16 * 1024 * 4
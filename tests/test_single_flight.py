@@ -0,0 +1,56 @@
+import threading
+import time
+
+import pytest
+
+from predictionguard.src.single_flight import SingleFlight
+
+
+def _storm(function, callers=8):
+    barrier = threading.Barrier(callers)
+    results = [None] * callers
+
+    def run(index):
+        barrier.wait()
+        try:
+            results[index] = function()
+        except Exception as error:
+            results[index] = error
+
+    threads = [threading.Thread(target=run, args=(index,)) for index in range(callers)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return results
+
+
+def test_single_flight_coalesces():
+    single_flight = SingleFlight()
+    calls = []
+
+    def request():
+        calls.append(1)
+        time.sleep(0.1)
+        return {"data": [1, 2, 3]}
+
+    results = _storm(lambda: single_flight.do(("/rerank", "payload"), request))
+
+    assert len(calls) == 1
+    assert all(result == {"data": [1, 2, 3]} for result in results)
+    assert len({id(result) for result in results}) == len(results)
+    assert len(single_flight) == 0
+
+
+def test_single_flight_error():
+    single_flight = SingleFlight()
+
+    def request():
+        time.sleep(0.1)
+        raise ValueError("Could not rank documents. ")
+
+    results = _storm(lambda: single_flight.do(("/rerank", "payload"), request))
+
+    assert all(type(result) is ValueError for result in results)
+    with pytest.raises(ValueError):
+        single_flight.do(("/rerank", "payload"), request)
@@ -6,4 +6,26 @@ def test_toxicity_check():
 
     response = test_client.toxicity.check(text="This is a perfectly fine statement.")
 
-    assert type(response["checks"][0]["score"]) is float
\ No newline at end of file
+    assert type(response["checks"][0]["score"]) is float
+
+
+def test_toxicity_check_column():
+    test_client = PredictionGuard()
+
+    response = test_client.toxicity.check_column(
+        ["This is a perfectly fine statement.", "This is another fine statement."]
+    )
+
+    assert len(response) == 2
+    assert type(response[0]) is float
+
+
+def test_toxicity_check_cache():
+    test_client = PredictionGuard()
+    test_client.toxicity.enable_cache()
+
+    first = test_client.toxicity.check(text="This is a perfectly fine statement.")
+    second = test_client.toxicity.check(text="This is a perfectly fine statement.")
+
+    assert second["checks"] == first["checks"]
+    assert type(second["checks"][0]["score"]) is float
@@ -0,0 +1,74 @@
+import pytest
+
+from predictionguard.src.vector_index import VectorIndex
+
+numpy = pytest.importorskip("numpy")
+
+
+def _vectors():
+    return numpy.random.default_rng(0).standard_normal((500, 16)).astype(numpy.float32)
+
+
+def test_vector_index_search():
+    vectors = _vectors()
+
+    index = VectorIndex()
+    index.add(["doc-" + str(i) for i in range(500)], vectors)
+
+    ids, scores = index.search(vectors[:3], k=2)
+
+    assert [query_ids[0] for query_ids in ids] == ["doc-0", "doc-1", "doc-2"]
+    assert scores.shape == (3, 2)
+    assert scores[0, 0] >= scores[0, 1]
+
+
+def test_vector_index_delete():
+    vectors = _vectors()
+
+    index = VectorIndex()
+    index.add(list(range(500)), vectors)
+    index.delete([7])
+
+    ids, _ = index.search(vectors[7], k=5)
+
+    assert len(index) == 499
+    assert 7 not in ids
+
+
+def test_vector_index_ivf_save_load(tmp_path):
+    vectors = _vectors()
+
+    index = VectorIndex()
+    index.add(list(range(500)), vectors)
+    index.train(n_lists=8)
+    index.save(str(tmp_path))
+
+    loaded = VectorIndex.load(str(tmp_path))
+    ids, _ = loaded.search(vectors[42], k=1, n_probe=8)
+
+    assert ids == [42]
+
+
+def test_vector_index_ivf_padding():
+    vectors = _vectors()[:12]
+
+    index = VectorIndex()
+    index.add(list(range(12)), vectors)
+    index.train(n_lists=2)
+
+    # Each query only sees its own partition, and the partitions differ in size.
+    assert len(set(len(rows) for rows in index._lists)) == 2
+    ids, scores = index.search(vectors, k=12, n_probe=1)
+
+    assert [len(query_ids) for query_ids in ids] == [scores.shape[1]] * 12
+    padded = numpy.array([[id is None for id in query_ids] for query_ids in ids])
+    assert padded.any()
+    assert (padded == numpy.isneginf(scores)).all()
+
+
+def test_vector_index_save_ids(tmp_path):
+    index = VectorIndex()
+    index.add([("scope", 1)], _vectors()[:1])
+
+    with pytest.raises(ValueError):
+        index.save(str(tmp_path))